@@ -0,0 +1,90 @@
+"""Сравнение кодеков сжатия на типичной странице постов.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_compression.py [--posts 100] [--rounds 50]
+
+Для каждого установленного кодека и уровня сжатия печатает размер
+ответа, степень сжатия и время CPU на сжатие одной страницы целиком и
+потоком по частям, как это делает `CompressionMiddleware`.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'yatube_api'))
+
+from yatube_api import middleware  # noqa: E402
+
+WORDS = (
+    'писатель рукопись глава роман рассказ издательство редактор сюжет '
+    'персонаж вдохновение черновик обложка читатель тираж рецензия '
+    'the of and story chapter draft novel editor publisher'
+).split()
+
+
+def make_page(posts, seed=0):
+    """Страница постов в том же формате, что отдаёт `/api/v1/posts/`."""
+    rnd = random.Random(seed)
+    results = []
+    for pk in range(1, posts + 1):
+        text = ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(40, 400)))
+        results.append({
+            'id': pk,
+            'text': text,
+            'pub_date': f'2023-05-{pk % 28 + 1:02d}T12:{pk % 60:02d}:00Z',
+            'author': f'writer{rnd.randint(1, 50)}',
+            'group': rnd.choice((None, 1, 2, 3)),
+        })
+    return json.dumps(results, ensure_ascii=False).encode()
+
+
+def encoders():
+    yield middleware.GzipEncoder(1)
+    yield middleware.GzipEncoder(6)
+    yield middleware.GzipEncoder(9)
+    if middleware.brotli is not None:
+        for level in (1, 4, 9):
+            yield middleware.BrotliEncoder(level)
+    if middleware.zstandard is not None:
+        for level in (1, 3, 9):
+            yield middleware.ZstdEncoder(level)
+
+
+def measure(func, rounds):
+    started = time.process_time()
+    for _ in range(rounds):
+        result = func()
+    return (time.process_time() - started) / rounds, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--chunk', type=int, default=8192)
+    args = parser.parse_args()
+
+    page = make_page(args.posts)
+    chunks = [page[i:i + args.chunk] for i in range(0, len(page), args.chunk)]
+    print(f'Страница: {args.posts} постов, {len(page)} байт')
+    print(f'{"кодек":<10}{"байт":>10}{"сжатие":>9}'
+          f'{"мс":>9}{"мс поток":>11}{"МБ/с":>9}')
+    for encoder in encoders():
+        seconds, compressed = measure(
+            lambda: encoder.compress(page), args.rounds)
+        stream_seconds, _ = measure(
+            lambda: b''.join(encoder.stream(chunks)), args.rounds)
+        name = f'{encoder.name}-{encoder.level}'
+        print(f'{name:<10}{len(compressed):>10}'
+              f'{len(page) / len(compressed):>8.1f}x'
+              f'{seconds * 1000:>9.2f}{stream_seconds * 1000:>11.2f}'
+              f'{len(page) / seconds / 2 ** 20:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Время одного хэширования пароля при разных параметрах хэшеров.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_hashers.py [--rounds 5]
+
+Помогает подобрать `PASSWORD_PBKDF2_ITERATIONS`, `PASSWORD_SCRYPT_*` и
+`PASSWORD_ARGON2_*`: обычно целятся в 50–100 мс на вход. Argon2
+измеряется, только если установлен пакет argon2-cffi.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'yatube_api'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test.utils import override_settings  # noqa: E402
+
+from yatube_api.hashers import (Argon2PasswordHasher,  # noqa: E402
+                                PBKDF2PasswordHasher, ScryptPasswordHasher)
+
+CONFIGURATIONS = [
+    (PBKDF2PasswordHasher, {'PASSWORD_PBKDF2_ITERATIONS': iterations})
+    for iterations in (100000, 260000, 390000)
+] + [
+    (ScryptPasswordHasher, {'PASSWORD_SCRYPT_WORK_FACTOR': 2 ** power})
+    for power in (14, 15, 16)
+] + [
+    (Argon2PasswordHasher, {'PASSWORD_ARGON2_TIME_COST': time_cost,
+                            'PASSWORD_ARGON2_MEMORY_COST': 65536})
+    for time_cost in (2, 3)
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    print('Среднее время хэширования пароля')
+    for hasher_class, overrides in CONFIGURATIONS:
+        hasher = hasher_class()
+        params = ', '.join(
+            f'{key}={value}' for key, value in overrides.items())
+        with override_settings(**overrides):
+            try:
+                hasher.encode('password', hasher.salt())
+            except ValueError:
+                print(f'  {hasher.algorithm:<14}не установлен  {params}')
+                continue
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                hasher.encode('password', hasher.salt())
+            seconds = (time.perf_counter() - started) / args.rounds
+        print(f'  {hasher.algorithm:<14}{seconds * 1000:>8.1f} мс  {params}')
+
+
+if __name__ == '__main__':
+    main()
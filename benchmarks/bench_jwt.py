@@ -0,0 +1,143 @@
+"""Сколько JWT в секунду выдаётся, обновляется и проверяется.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_jwt.py [--rounds 2000] [--create-rounds 20]
+
+Для HS256 и RS256 (ключи RSA создаются во временной папке) в
+отдельном процессе измеряются сериализаторы simplejwt и их версии из
+`api/tokens.py`, которые повторно используют результат для того же
+токена. `create` включает проверку пароля хэшером из настроек.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'yatube_api')
+sys.path.insert(0, PROJECT_DIR)
+
+# ES256 появится вместе с simplejwt 5: версия 4.7 знает только HS и RS.
+ALGORITHMS = ('HS256', 'RS256')
+
+
+def write_keys(algorithm, directory):
+    """PEM-ключи RSA и переменные окружения, которые их включают."""
+    if algorithm.startswith('HS'):
+        return {}
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption())
+    public = key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo)
+    paths = {}
+    for name, data in (('private', private), ('public', public)):
+        paths[name] = os.path.join(directory, f'{algorithm}_{name}.pem')
+        with open(paths[name], 'wb') as file:
+            file.write(data)
+    return {
+        'JWT_ALGORITHM': algorithm,
+        'JWT_PRIVATE_KEY_FILE': paths['private'],
+        'JWT_PUBLIC_KEY_FILE': paths['public'],
+    }
+
+
+def per_second(func, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return rounds / (time.perf_counter() - started)
+
+
+def measure(rounds, create_rounds):
+    """Выполняется в дочернем процессе с нужным алгоритмом."""
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'yatube_api.settings'
+    django.setup()
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+    from django.contrib.auth import get_user_model
+    from rest_framework_simplejwt import serializers
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from api import tokens
+    from api.authentication import refreshed_tokens, verified_tokens
+
+    user = get_user_model().objects.create_user('bench', password='bench')
+    refresh = RefreshToken.for_user(user)
+    access = str(refresh.access_token)
+    refresh = str(refresh)
+
+    def validate(serializer_class, **data):
+        return lambda: serializer_class(data=data).is_valid(
+            raise_exception=True)
+
+    results = {
+        'create': per_second(
+            validate(serializers.TokenObtainPairSerializer,
+                     username='bench', password='bench'),
+            create_rounds),
+        'refresh': per_second(
+            validate(serializers.TokenRefreshSerializer, refresh=refresh),
+            rounds),
+        'verify': per_second(
+            validate(serializers.TokenVerifySerializer, token=access),
+            rounds),
+    }
+    refreshed_tokens.clear()
+    verified_tokens.clear()
+    results['refresh, повтор'] = per_second(
+        validate(tokens.TokenRefreshSerializer, refresh=refresh), rounds)
+    results['verify, повтор'] = per_second(
+        validate(tokens.TokenVerifySerializer, token=access), rounds)
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--create-rounds', type=int, default=20)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.rounds, args.create_rounds)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {}
+        for algorithm in ALGORITHMS:
+            env = dict(os.environ, **write_keys(algorithm, directory))
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child',
+                 '--rounds', str(args.rounds),
+                 '--create-rounds', str(args.create_rounds)],
+                cwd=PROJECT_DIR, env=env, check=True, capture_output=True,
+                text=True,
+            ).stdout
+            results[algorithm] = json.loads(output)
+
+    operations = list(results[ALGORITHMS[0]])
+    print('Токенов в секунду')
+    print(f'  {"":<20}' + ''.join(f'{name:>12}' for name in ALGORITHMS))
+    for operation in operations:
+        print(f'  {operation:<20}' + ''.join(
+            f'{results[name][operation]:>12.0f}' for name in ALGORITHMS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Накладные расходы middleware на запрос к API и время запуска.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_middleware.py [--requests 2000]
+
+Сравнивает настройки `yatube_api.settings` и
+`yatube_api.settings_production`: время импорта WSGI-приложения в
+отдельном процессе и время обработки GET-запроса к API целиком через
+WSGI-хендлер на тестовой базе в памяти.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'yatube_api')
+sys.path.insert(0, PROJECT_DIR)
+
+PROFILES = ('yatube_api.settings', 'yatube_api.settings_production')
+
+STARTUP_SCRIPT = (
+    'import time; started = time.perf_counter(); '
+    'from yatube_api.wsgi import application; '
+    'print(time.perf_counter() - started)'
+)
+
+
+def measure_startup(settings_module, runs):
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE=settings_module,
+        DJANGO_SECRET_KEY=os.environ.get('DJANGO_SECRET_KEY', 'bench'),
+    )
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT], cwd=PROJECT_DIR, env=env,
+            check=True, capture_output=True, text=True,
+        ).stdout
+        timings.append(float(output))
+    return min(timings)
+
+
+def measure_requests(path, requests):
+    """Время одного запроса для каждого набора middleware и DEBUG."""
+    import django
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import override_settings, setup_test_environment
+
+    os.environ.setdefault('DJANGO_SECRET_KEY', 'bench')
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'yatube_api.settings'
+    django.setup()
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+    from yatube_api import settings_production
+    environ = RequestFactory().get(path).environ
+    results = {}
+    for name, middleware, debug in (
+        ('settings', None, True),
+        ('settings_production', settings_production.MIDDLEWARE, False),
+    ):
+        overrides = {'DEBUG': debug, 'ALLOWED_HOSTS': ['*']}
+        if middleware is not None:
+            overrides['MIDDLEWARE'] = middleware
+        with override_settings(**overrides):
+            handler = WSGIHandler()
+            for _ in range(50):
+                handler(dict(environ), lambda *args: None)
+            started = time.perf_counter()
+            for _ in range(requests):
+                handler(dict(environ), lambda *args: None)
+            results[name] = (time.perf_counter() - started) / requests
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--startup-runs', type=int, default=5)
+    parser.add_argument('--path', default='/api/v1/groups/')
+    args = parser.parse_args()
+
+    print('Запуск WSGI-приложения, лучшее из', args.startup_runs)
+    for profile in PROFILES:
+        seconds = measure_startup(profile, args.startup_runs)
+        print(f'  {profile:<32}{seconds * 1000:>8.1f} мс')
+
+    print(f'GET {args.path}, среднее по {args.requests} запросам')
+    for name, seconds in measure_requests(args.path, args.requests).items():
+        print(f'  {name:<32}{seconds * 1e6:>8.0f} мкс')
+
+
+if __name__ == '__main__':
+    main()
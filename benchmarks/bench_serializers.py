@@ -0,0 +1,95 @@
+"""Создание сериализаторов и `.data` с кэшем полей и без него.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_serializers.py [--objects 1000] [--rounds 20]
+
+«Без кэша» — те же классы из `api/serializers.py`, у которых
+`get_fields()` и `_readable_fields` взяты напрямую из DRF. База не
+нужна: объекты создаются в памяти.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'yatube_api'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework import serializers  # noqa: E402
+
+from api.serializers import (CachedFieldsMixin, CommentSerializer,  # noqa
+                             GroupSerializer, PostSerializer)
+from posts.models import Comment, Group, Post, User  # noqa: E402
+
+
+def uncached(serializer_class):
+    """Копия сериализатора с поведением DRF по умолчанию."""
+    def get_fields(self):
+        return super(CachedFieldsMixin, self).get_fields()
+
+    return type(f'Uncached{serializer_class.__name__}', (serializer_class,), {
+        'get_fields': get_fields,
+        '_readable_fields': serializers.Serializer._readable_fields,
+    })
+
+
+def make_objects(count):
+    now = datetime.now(timezone.utc)
+    authors = [User(pk=pk, username=f'writer{pk}') for pk in range(1, 51)]
+    group = Group(pk=1, title='Группа', slug='group', description='')
+    posts = [
+        Post(pk=pk, text='Текст поста ' * 20, pub_date=now,
+             author=authors[pk % 50], group=group)
+        for pk in range(1, count + 1)
+    ]
+    comments = [
+        Comment(pk=pk, text='Комментарий', created=now,
+                author=authors[pk % 50], post=posts[pk % count])
+        for pk in range(1, count + 1)
+    ]
+    groups = [
+        Group(pk=pk, title=f'Группа {pk}', slug=f'g{pk}', description='')
+        for pk in range(1, count + 1)
+    ]
+    return {PostSerializer: posts, CommentSerializer: comments,
+            GroupSerializer: groups}
+
+
+def best_of(func, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--objects', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    objects = make_objects(args.objects)
+    print(f'{"сериализатор":<20}{"вариант":<11}'
+          f'{"создание×1000, мс":>19}{".data, мс":>12}')
+    for serializer_class, instances in objects.items():
+        for label, cls in (('без кэша', uncached(serializer_class)),
+                           ('с кэшем', serializer_class)):
+            construct = best_of(
+                lambda: [cls().fields for _ in range(1000)], args.rounds)
+            data = best_of(
+                lambda: cls(instances, many=True).data, args.rounds)
+            print(f'{serializer_class.__name__:<20}{label:<11}'
+                  f'{construct * 1000:>19.1f}{data * 1000:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+"""Нагрузочный тест API на локальном сервере с несколькими воркерами.
+
+Запуск из корня репозитория:
+
+    python benchmarks/load_test.py [--scenario feed] [--server builtin]
+        [--workers 4] [--concurrency 32] [--duration 20]
+
+Скрипт создаёт отдельную базу SQLite во временной папке, наполняет её,
+запускает сервер с `--workers` процессами, получает JWT-токены через
+`/api/v1/jwt/create/` и `--duration` секунд гоняет сценарий из
+`--concurrency` виртуальных пользователей. В конце печатает пропускную
+способность, коды ответов и перцентили задержки по каждому запросу.
+
+Серверы:
+
+* `builtin` — WSGI (`yatube_api.wsgi`) на `wsgiref`, воркеры-процессы
+  с общим сокетом, без зависимостей;
+* `gunicorn` — `yatube_api.wsgi` под gunicorn, sync-воркеры;
+* `uvicorn` — `yatube_api.asgi` под uvicorn.
+
+Сценарии:
+
+* `feed` — чтение ленты: страницы постов, отдельные посты, комментарии;
+* `comments` — всплески комментариев к нескольким «горячим» постам;
+* `follows` — все пользователи одновременно подписываются друг на друга.
+
+HTTP-клиент написан на asyncio, чтобы генератор нагрузки не требовал
+сторонних пакетов.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlencode
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'yatube_api')
+sys.path.insert(0, PROJECT_DIR)
+
+PASSWORD = 'load-test-password'
+
+SETTINGS_TEMPLATE = '''from yatube_api.settings import *  # noqa
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+DATABASES = {{
+    'default': {{
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': {database!r},
+        'OPTIONS': {{'timeout': {timeout}}},
+    }}
+}}
+'''
+
+
+class HTTPClient:
+    """Минимальный клиент HTTP/1.1 с keep-alive для одного хоста."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, token=None):
+        """Возвращаем код ответа и тело, при разрыве переподключаемся."""
+        for attempt in range(2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(
+                    self.host, self.port)
+            try:
+                return await self._send(method, path, body, token)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt:
+                    raise
+
+    async def _send(self, method, path, body, token):
+        payload = json.dumps(body).encode() if body is not None else b''
+        headers = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Accept: application/json',
+            f'Content-Length: {len(payload)}',
+        ]
+        if payload:
+            headers.append('Content-Type: application/json')
+        if token is not None:
+            headers.append(f'Authorization: Bearer {token}')
+        self.writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode()
+                          + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b'\r\n')
+        version, status = status_line.split()[:2]
+        response_headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in response_headers:
+            content = await self.reader.readexactly(
+                int(response_headers['content-length']))
+        elif response_headers.get('transfer-encoding') == 'chunked':
+            content = await self._read_chunked()
+        else:
+            content = await self.reader.read()
+            await self.close()
+            return int(status), content
+        if (version == b'HTTP/1.0'
+                or response_headers.get('connection') == 'close'):
+            await self.close()
+        return int(status), content
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0],
+                       16)
+            if not size:
+                await self.reader.readuntil(b'\r\n')
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+
+class Stats:
+    """Задержки и коды ответов по названиям запросов."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    def add(self, name, status, seconds):
+        self.latencies[name].append(seconds)
+        self.statuses[name][status] += 1
+
+    @staticmethod
+    def percentile(values, fraction):
+        return values[min(len(values) - 1, int(len(values) * fraction))]
+
+    def report(self, elapsed):
+        total = sum(len(values) for values in self.latencies.values())
+        rows = {}
+        print(f'{"запрос":<28}{"всего":>8}{"в сек":>9}'
+              f'{"p50":>9}{"p90":>9}{"p99":>9}{"max":>9}  коды')
+        for name in sorted(self.latencies):
+            values = sorted(self.latencies[name])
+            row = {
+                'requests': len(values),
+                'rps': len(values) / elapsed,
+                'p50': self.percentile(values, 0.5),
+                'p90': self.percentile(values, 0.9),
+                'p99': self.percentile(values, 0.99),
+                'max': values[-1],
+                'statuses': dict(self.statuses[name]),
+            }
+            rows[name] = row
+            codes = ' '.join(
+                f'{code}×{count}'
+                for code, count in sorted(row['statuses'].items()))
+            print(f'{name:<28}{row["requests"]:>8}{row["rps"]:>9.1f}'
+                  + ''.join(f'{row[key] * 1000:>7.1f}мс'
+                            for key in ('p50', 'p90', 'p99', 'max'))
+                  + f'  {codes}')
+        errors = sum(
+            count for counter in self.statuses.values()
+            for status, count in counter.items()
+            if status == 0 or status >= 500)
+        print(f'Итого {total} запросов за {elapsed:.1f} с: '
+              f'{total / elapsed:.1f} в секунду, ошибок сервера {errors}.')
+        return {'elapsed': elapsed, 'total': total, 'errors': errors,
+                'requests': rows}
+
+
+class Scenario:
+    """Виртуальный пользователь выбирает запросы в цикле."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def next_request(self, user):
+        """(название, метод, путь, тело) следующего запроса."""
+        raise NotImplementedError
+
+
+class FeedScenario(Scenario):
+
+    def next_request(self, user):
+        roll = random.random()
+        if roll < 0.6:
+            offset = random.randrange(0, 200, 20)
+            query = urlencode({'limit': 20, 'offset': offset})
+            return 'GET posts page', 'GET', f'/api/v1/posts/?{query}', None
+        post_id = random.choice(self.data['posts'])
+        if roll < 0.85:
+            return 'GET post', 'GET', f'/api/v1/posts/{post_id}/', None
+        return ('GET comments', 'GET', f'/api/v1/posts/{post_id}/comments/',
+                None)
+
+
+class CommentsScenario(Scenario):
+    """Всплески: пачка комментариев подряд, затем чтение списка."""
+
+    burst = 5
+
+    def next_request(self, user):
+        user.setdefault('sent', 0)
+        post_id = random.choice(self.data['posts'][:5])
+        user['sent'] += 1
+        if user['sent'] % (self.burst + 1):
+            return ('POST comment', 'POST',
+                    f'/api/v1/posts/{post_id}/comments/',
+                    {'text': f'Комментарий {user["sent"]}'})
+        return ('GET comments', 'GET', f'/api/v1/posts/{post_id}/comments/',
+                None)
+
+
+class FollowsScenario(Scenario):
+    """Каждый подписывается на всех по очереди, затем читает подписки."""
+
+    def next_request(self, user):
+        targets = user.setdefault('targets', [
+            name for name in self.data['usernames']
+            if name != user['username']
+        ])
+        if targets:
+            return ('POST follow', 'POST', '/api/v1/follow/',
+                    {'following': targets.pop()})
+        return 'GET follow', 'GET', '/api/v1/follow/', None
+
+
+SCENARIOS = {
+    'feed': FeedScenario,
+    'comments': CommentsScenario,
+    'follows': FollowsScenario,
+}
+
+
+def prepare_database(workdir, args):
+    """Создаём базу, наполняем её и возвращаем id постов и имена."""
+    database = os.path.join(workdir, 'load_test.sqlite3')
+    with open(os.path.join(workdir, 'load_test_settings.py'), 'w') as file:
+        file.write(SETTINGS_TEMPLATE.format(
+            database=database, timeout=args.sqlite_timeout))
+    sys.path.insert(0, workdir)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'load_test_settings'
+
+    import django
+    from django.contrib.auth.hashers import make_password
+    from django.core.management import call_command
+    from django.db import connections
+
+    django.setup()
+    call_command('migrate', verbosity=0)
+
+    from django.contrib.auth import get_user_model
+    from posts.models import Comment, Group, Post
+
+    User = get_user_model()
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(username=f'load_user_{i}', password=password)
+        for i in range(args.users))
+    users = list(User.objects.order_by('pk'))
+    Group.objects.bulk_create(
+        Group(title=f'Группа {i}', slug=f'load_group_{i}', description='')
+        for i in range(5))
+    groups = list(Group.objects.order_by('pk'))
+    Post.objects.bulk_create(
+        Post(text=f'Пост {i}', author=users[i % len(users)],
+             group=groups[i % len(groups)])
+        for i in range(args.posts))
+    posts = list(Post.objects.values_list('pk', flat=True))
+    Comment.objects.bulk_create(
+        Comment(post_id=post_id, author=users[i % len(users)],
+                text=f'Комментарий {i}')
+        for i, post_id in enumerate(posts * 3))
+    connections.close_all()
+    return {
+        'posts': posts,
+        'usernames': [user.username for user in users],
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(args, port):
+    if args.server == 'gunicorn':
+        return ['gunicorn', '--workers', str(args.workers),
+                '--bind', f'127.0.0.1:{port}', 'yatube_api.wsgi:application']
+    if args.server == 'uvicorn':
+        return ['uvicorn', '--workers', str(args.workers),
+                '--host', '127.0.0.1', '--port', str(port),
+                '--no-access-log', 'yatube_api.asgi:application']
+    return [sys.executable, os.path.abspath(__file__), '--serve',
+            '--workers', str(args.workers), '--port', str(port)]
+
+
+def serve_builtin(port, workers):
+    """WSGI-сервер на wsgiref: воркеры-процессы на общем сокете."""
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+    from yatube_api.warmup import warm_up
+    from yatube_api.wsgi import application
+
+    # Приложение импортируется до fork: соединение с базой каждый
+    # воркер откроет сам.
+    warm_up(connect=False)
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = WSGIServer(('127.0.0.1', port), QuietHandler)
+    server.set_app(application)
+    server.socket.listen(1024)
+    for _ in range(workers - 1):
+        if os.fork() == 0:
+            break
+    server.serve_forever()
+
+
+async def wait_for_server(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        client = HTTPClient(host, port)
+        try:
+            await client.request('GET', '/api/v1/')
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+        finally:
+            await client.close()
+    raise RuntimeError('Сервер не запустился за отведённое время.')
+
+
+async def mint_tokens(host, port, usernames):
+    """Получаем access-токены через `/api/v1/jwt/create/`."""
+    async def mint(username):
+        client = HTTPClient(host, port)
+        try:
+            status, content = await client.request(
+                'POST', '/api/v1/jwt/create/',
+                {'username': username, 'password': PASSWORD})
+        finally:
+            await client.close()
+        if status != 200:
+            raise RuntimeError(
+                f'Не удалось получить токен для {username}: {status}.')
+        return json.loads(content)['access']
+
+    started = time.perf_counter()
+    tokens = await asyncio.gather(*map(mint, usernames))
+    elapsed = time.perf_counter() - started
+    print(f'Получено {len(tokens)} токенов за {elapsed:.2f} с.')
+    return dict(zip(usernames, tokens))
+
+
+async def run_load(args, data):
+    host, port = '127.0.0.1', args.port
+    await wait_for_server(host, port)
+    tokens = await mint_tokens(host, port, data['usernames'])
+    scenario = SCENARIOS[args.scenario](data)
+    stats = Stats()
+    deadline = time.monotonic() + args.duration
+
+    async def virtual_user(number):
+        username = data['usernames'][number % len(data['usernames'])]
+        user = {'username': username}
+        client = HTTPClient(host, port)
+        try:
+            while time.monotonic() < deadline:
+                name, method, path, body = scenario.next_request(user)
+                started = time.perf_counter()
+                try:
+                    status, _ = await client.request(
+                        method, path, body, tokens[username])
+                except (OSError, asyncio.IncompleteReadError):
+                    status = 0
+                stats.add(name, status, time.perf_counter() - started)
+        finally:
+            await client.close()
+
+    started = time.monotonic()
+    await asyncio.gather(*map(virtual_user, range(args.concurrency)))
+    return stats.report(time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', choices=SCENARIOS, default='feed')
+    parser.add_argument('--server', default='builtin',
+                        choices=('builtin', 'gunicorn', 'uvicorn'))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--sqlite-timeout', type=float, default=5,
+                        help='сколько секунд SQLite ждёт снятия блокировки')
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--json', help='сохранить отчёт в файл')
+    parser.add_argument('--serve', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_builtin(args.port, args.workers)
+        return
+
+    args.port = args.port or free_port()
+    workdir = tempfile.mkdtemp(prefix='yatube-load-')
+    server = None
+    try:
+        data = prepare_database(workdir, args)
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join((workdir, PROJECT_DIR)),
+            DJANGO_SETTINGS_MODULE='load_test_settings',
+        )
+        if args.server != 'builtin':
+            # gunicorn без --preload и uvicorn импортируют приложение в
+            # каждом воркере, встроенный сервер прогревается сам до fork.
+            env['DJANGO_WARMUP'] = '1'
+        print(f'Сервер {args.server}, воркеров {args.workers}, '
+              f'сценарий {args.scenario}, клиентов {args.concurrency}.')
+        server = subprocess.Popen(
+            server_command(args, args.port), cwd=PROJECT_DIR,
+            env=env, start_new_session=True)
+        report = asyncio.run(run_load(args, data))
+        report.update(scenario=args.scenario, server=args.server,
+                      workers=args.workers, concurrency=args.concurrency)
+        if args.json:
+            with open(args.json, 'w') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+    finally:
+        if server is not None:
+            # Воркеры встроенного сервера — дочерние процессы одной группы.
+            os.killpg(server.pid, 15)
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
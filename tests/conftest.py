@@ -1,6 +1,8 @@
 import sys
 import os
 
+import pytest
+
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
@@ -27,9 +29,46 @@ if FILENAME not in project_dir_content:
         'Убедитесь, что у вас верная структура проекта.'
     )
 
+@pytest.fixture(autouse=True)
+def write_behind_counters(monkeypatch):
+    """Счётчики без фонового потока: тесты сбрасывают их сами.
+
+    Настройка меняется на месте, а не фикстурой `settings`: её обёртка
+    прячет `settings.SETTINGS_MODULE`, который тесты передают дочерним
+    процессам.
+    """
+    from django.conf import settings
+    from posts.counters import group_posts, post_views
+
+    monkeypatch.setattr(settings, 'COUNTERS_FLUSH_INTERVAL', None)
+    yield
+    post_views.discard()
+    group_posts.discard()
+
+
+@pytest.fixture(autouse=True)
+def jwt_caches():
+    from api.authentication import refreshed_tokens, verified_tokens
+
+    yield
+    verified_tokens.clear()
+    refreshed_tokens.clear()
+
+
+@pytest.fixture(autouse=True)
+def username_cache():
+    """id пользователей повторяются между тестами, кэш нужен пустой."""
+    from posts.usernames import usernames
+
+    yield
+    usernames.clear()
+
+
 pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
+    'tests.fixtures.fixture_dataset',
+    'tests.fixtures.fixture_queries',
 ]
 
 # test .md
@@ -0,0 +1,77 @@
+from collections import namedtuple
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from posts.models import Comment, Follow, Group, Post
+
+# Первичные ключи большого набора начинаются отсюда, чтобы не пересекаться
+# с объектами обычных фикстур, созданными в том же тесте.
+FIRST_PK = 100_000
+
+LARGE_DATASET_SIZE = {
+    'users': 50,
+    'groups': 10,
+    'posts': 1000,
+    'comments_per_post': 3,
+}
+
+Dataset = namedtuple('Dataset', 'users groups posts comments follows')
+
+
+def build_large_dataset(users, groups, posts, comments_per_post):
+    """Несохранённые объекты с заданными pk и связями."""
+    User = get_user_model()
+    password = make_password('1234567')
+    user_rows = [
+        User(pk=FIRST_PK + i, username=f'bulk_user_{i}', password=password)
+        for i in range(users)
+    ]
+    group_rows = [
+        Group(pk=FIRST_PK + i, title=f'Группа {i}', slug=f'bulk_group_{i}',
+              description='', posts_count=posts // groups)
+        for i in range(groups)
+    ]
+    post_rows = [
+        Post(pk=FIRST_PK + i, text=f'Пост {i}',
+             author_id=FIRST_PK + i % users, group_id=FIRST_PK + i % groups)
+        for i in range(posts)
+    ]
+    comment_rows = [
+        Comment(pk=FIRST_PK + i * comments_per_post + j,
+                post_id=FIRST_PK + i,
+                author_id=FIRST_PK + (i + j + 1) % users,
+                text=f'Коммент {j} к посту {i}')
+        for i in range(posts)
+        for j in range(comments_per_post)
+    ]
+    follow_rows = [
+        Follow(pk=FIRST_PK + i, user_id=FIRST_PK + i,
+               following_id=FIRST_PK + (i + 1) % users)
+        for i in range(users)
+    ]
+    return Dataset(user_rows, group_rows, post_rows, comment_rows,
+                   follow_rows)
+
+
+def insert_dataset(dataset):
+    for rows in dataset:
+        type(rows[0]).objects.bulk_create(rows, batch_size=500)
+
+
+@pytest.fixture(scope='session')
+def large_dataset_rows():
+    """Набор строится один раз за сессию, хэш пароля считается один раз."""
+    return build_large_dataset(**LARGE_DATASET_SIZE)
+
+
+@pytest.fixture
+def large_dataset(db, large_dataset_rows):
+    """Большой набор данных в базе текущего теста.
+
+    Строки вставляются пачками по готовым объектам, поэтому фикстура
+    работает и в транзакционных тестах, которые очищают базу.
+    """
+    insert_dataset(large_dataset_rows)
+    return large_dataset_rows
@@ -0,0 +1,99 @@
+import threading
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext
+
+
+def format_queries(captured):
+    return '\n'.join(
+        f'{number}. {query["sql"]}'
+        for number, query in enumerate(captured.captured_queries, 1)
+    )
+
+
+class QueryBudget:
+    """Проверки числа SQL-запросов, которые выполняет код.
+
+    `with query_budget(2, 'GET /api/v1/posts/'):` падает, если внутри
+    блока выполнено больше двух запросов, и печатает их. С `exact=True`
+    падает и при любом другом числе запросов, чтобы бюджет не отставал от
+    кода, который стал делать меньше запросов.
+    `query_budget.assert_constant(request, grow)` проверяет, что число
+    запросов `request()` не меняется после того, как `grow()` добавил
+    строк в базу.
+    """
+
+    @contextmanager
+    def __call__(self, budget, label='Код', exact=False):
+        with CaptureQueriesContext(connection) as captured:
+            yield captured
+        if len(captured) > budget or exact and len(captured) != budget:
+            pytest.fail(
+                f'{label}: {len(captured)} запросов к базе при бюджете '
+                f'{budget}.\n{format_queries(captured)}',
+                pytrace=False,
+            )
+
+    @staticmethod
+    def capture(func):
+        with CaptureQueriesContext(connection) as captured:
+            func()
+        return captured
+
+    def assert_constant(self, request, grow, label='Код'):
+        before = self.capture(request)
+        grow()
+        after = self.capture(request)
+        if len(after) != len(before):
+            pytest.fail(
+                f'{label}: число запросов к базе зависит от числа строк: '
+                f'{len(before)} до роста данных и {len(after)} после.\n'
+                f'До:\n{format_queries(before)}\n'
+                f'После:\n{format_queries(after)}',
+                pytrace=False,
+            )
+
+
+@pytest.fixture
+def query_budget():
+    return QueryBudget()
+
+
+class SharedConnectionExecutor(Executor):
+    """Пул, задачи которого работают на соединении теста.
+
+    Каждая задача выполняется в отдельном потоке, как в настоящем пуле,
+    но с тем же соединением с базой, что и тест, поэтому `query_budget`
+    видит её запросы. Поток теста в это время ждёт ответа и соединение
+    не трогает.
+    """
+
+    def __init__(self):
+        self.connection = connections[DEFAULT_DB_ALIAS]
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+
+        def run():
+            connections[DEFAULT_DB_ALIAS] = self.connection
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as error:
+                future.set_exception(error)
+            finally:
+                self.connection.dec_thread_sharing()
+
+        self.connection.inc_thread_sharing()
+        threading.Thread(target=run).start()
+        return future
+
+
+@pytest.fixture
+def inline_hash_pool(monkeypatch):
+    """Проверка пароля при входе — на соединении теста, а не в пуле."""
+    pool = SharedConnectionExecutor()
+    monkeypatch.setattr('api.tokens.get_hash_pool', lambda: pool)
+    return pool
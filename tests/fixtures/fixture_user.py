@@ -40,3 +40,14 @@ def user_client(token):
     client = APIClient()
     client.credentials(HTTP_AUTHORIZATION=f'Bearer {token["access"]}')
     return client
+
+
+@pytest.fixture
+def staff_client(admin_user):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    client = APIClient()
+    token = RefreshToken.for_user(admin_user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from posts.admin import EstimatedCountPaginator
+from posts.models import Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostAdmin:
+
+    changelist_url = '/admin/posts/post/'
+
+    def test_changelist_queries_do_not_grow(self, admin_client, user,
+                                            group_1,
+                                            django_assert_max_num_queries):
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=user, group=group_1)
+            for i in range(3)
+        )
+        admin_client.get(self.changelist_url)
+        with django_assert_max_num_queries(10) as captured:
+            response = admin_client.get(self.changelist_url)
+        assert response.status_code == HTTPStatus.OK
+        queries_for_three = len(captured.captured_queries)
+
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=user, group=group_1)
+            for i in range(20)
+        )
+        with django_assert_max_num_queries(queries_for_three):
+            response = admin_client.get(self.changelist_url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `PostAdmin` подгружает автора и группу '
+            'через `list_select_related`.'
+        )
+        assert isinstance(
+            response.context['cl'].paginator, EstimatedCountPaginator
+        )
+
+    def test_changelist_search_by_author(self, admin_client, post,
+                                         another_post):
+        response = admin_client.get(
+            self.changelist_url, {'q': post.author.username}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert list(response.context['cl'].result_list) == [post]
+
+    def test_changelist_search_by_group(self, admin_client, post, post_2,
+                                        another_post):
+        response = admin_client.get(
+            self.changelist_url, {'q': post.group.slug}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.context['cl'].result_list) == {post, post_2}
+
+    def test_changelist_search_uses_exact_ids(self, admin_client, post):
+        response = admin_client.get(
+            self.changelist_url, {'q': post.author.username.upper()}
+        )
+        assert list(response.context['cl'].result_list) == [], (
+            'Проверьте, что поиск постов в админке сравнивает username '
+            'точно, по уникальному индексу.'
+        )
+        with CaptureQueriesContext(connection) as captured:
+            admin_client.get(
+                self.changelist_url, {'q': post.author.username})
+        post_queries = [
+            query['sql'] for query in captured.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+        assert post_queries and not any(
+            'LIKE' in sql or 'UPPER' in sql for sql in post_queries
+        ), (
+            'Проверьте, что посты фильтруются по `author_id` и `group_id`, '
+            'а не по username и slug через JOIN.'
+        )
+
+    def test_autocomplete_for_group(self, admin_client, group_1, group_2):
+        response = admin_client.get(
+            '/admin/autocomplete/',
+            {'term': 'Группа 1', 'app_label': 'posts',
+             'model_name': 'post', 'field_name': 'group'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert [item['id'] for item in response.json()['results']] == [
+            str(group_1.pk)
+        ]
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from posts.models import AuthorSummary
+from posts.purge import purge_user
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAuthorAPI:
+    author_url = '/api/v1/authors/{username}/'
+
+    def get_profile(self, client, username):
+        response = client.get(self.author_url.format(username=username))
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.author_url}` возвращает '
+            'профиль автора со статусом 200.'
+        )
+        return response.json()
+
+    def test_profile_counters(self, client, user_client, user, user_2,
+                              another_post):
+        post_ids = [
+            user_client.post('/api/v1/posts/', data={'text': text}).json()
+            ['id'] for text in ('Первый', 'Второй', 'Третий')
+        ]
+        user_client.delete(f'/api/v1/posts/{post_ids[-1]}/')
+        user_client.post(
+            f'/api/v1/posts/{another_post.id}/comments/',
+            data={'text': 'Коммент'}
+        )
+        user_client.post('/api/v1/follow/', data={'following': 'TestUser2'})
+
+        profile = self.get_profile(client, user.username)
+        assert profile['username'] == user.username
+        assert profile['posts_count'] == 2, (
+            'Проверьте, что профиль автора содержит число его постов без '
+            'удалённых.'
+        )
+        assert profile['comments_count'] == 1
+        assert profile['following_count'] == 1
+        assert profile['followers_count'] == 0
+        assert [post['id'] for post in profile['latest_posts']] == [
+            post_ids[1], post_ids[0]
+        ], (
+            'Проверьте, что профиль содержит последние посты автора, '
+            'начиная с новых.'
+        )
+        assert self.get_profile(client, user_2.username)[
+            'followers_count'] == 1
+
+    def test_profile_not_found(self, client):
+        response = client.get(self.author_url.format(username='nobody'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_missing_summary_is_built(self, client, user, post, post_2):
+        AuthorSummary.objects.all().delete()
+        profile = self.get_profile(client, user.username)
+        assert profile['posts_count'] == 2, (
+            'Проверьте, что отсутствующая сводка автора считается заново.'
+        )
+
+    def test_refresh_rollups(self, client, user, post, post_2,
+                             comment_1_post, follow_1):
+        profile = self.get_profile(client, user.username)
+        assert profile['posts_count'] == 0
+        call_command('refresh_rollups', stdout=StringIO())
+        profile = self.get_profile(client, user.username)
+        assert (
+            profile['posts_count'], profile['comments_count'],
+            profile['following_count'], profile['followers_count']
+        ) == (2, 1, 1, 0), (
+            'Проверьте, что команда `refresh_rollups` пересчитывает сводки '
+            'авторов.'
+        )
+
+    def test_purge_user_updates_others(self, client, user, another_user,
+                                       follow_1, follow_4):
+        call_command('refresh_rollups', stdout=StringIO())
+        list(purge_user(user))
+        profile = self.get_profile(client, another_user.username)
+        assert profile['followers_count'] == 0, (
+            'Проверьте, что после удаления пользователя пересчитываются '
+            'сводки тех, на кого он был подписан.'
+        )
+        assert profile['following_count'] == 0
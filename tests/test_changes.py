@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Change
+
+
+@pytest.mark.django_db(transaction=True)
+class TestChangeFeed:
+
+    changes_url = '/api/v1/changes/'
+
+    def test_changes_require_staff(self, user_client):
+        response = user_client.get(self.changes_url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{self.changes_url}` доступен только '
+            'администраторам.'
+        )
+
+    def test_mutations_are_logged(self, user_client, staff_client, user,
+                                  another_user):
+        response = user_client.post('/api/v1/posts/', data={'text': 'Пост'})
+        post_id = response.json()['id']
+        user_client.patch(
+            f'/api/v1/posts/{post_id}/', data={'text': 'Новый текст'}
+        )
+        response = user_client.post(
+            f'/api/v1/posts/{post_id}/comments/', data={'text': 'Коммент'}
+        )
+        comment_id = response.json()['id']
+        user_client.delete(f'/api/v1/posts/{post_id}/comments/{comment_id}/')
+        user_client.post(
+            '/api/v1/follow/', data={'following': another_user.username}
+        )
+        user_client.delete(f'/api/v1/posts/{post_id}/')
+
+        response = staff_client.get(self.changes_url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [(c['model'], c['action']) for c in data['results']] == [
+            ('post', 'created'), ('post', 'updated'),
+            ('comment', 'created'), ('comment', 'deleted'),
+            ('follow', 'created'), ('post', 'deleted'),
+        ], (
+            'Проверьте, что изменения постов, комментариев и подписок '
+            'попадают в журнал в порядке выполнения.'
+        )
+        assert data['results'][1]['payload']['text'] == 'Новый текст'
+        assert data['results'][0]['object_id'] == post_id
+        assert data['next_after'] == data['results'][-1]['seq']
+
+    def test_changes_after_seq(self, staff_client, post, another_post,
+                               django_assert_num_queries):
+        first, second = (
+            Change.record(post, Change.CREATED),
+            Change.record(another_post, Change.CREATED),
+        )
+        # Пользователь из токена и одна выборка по индексу первичного ключа.
+        with django_assert_num_queries(2):
+            response = staff_client.get(
+                self.changes_url, {'after': first.pk, 'limit': 10}
+            )
+        data = response.json()
+        assert [c['seq'] for c in data['results']] == [second.pk], (
+            'Проверьте, что `?after=` отдаёт только более поздние записи.'
+        )
+        response = staff_client.get(
+            self.changes_url, {'after': data['next_after']}
+        )
+        assert response.json() == {
+            'results': [], 'next_after': data['next_after']
+        }
+
+    def test_changes_invalid_after(self, staff_client):
+        response = staff_client.get(self.changes_url, {'after': 'x'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -369,3 +369,65 @@ class TestCommentAPI:
             'Проверьте, что для неавторизованного пользователя DELETE-запрос '
             f'к `{self.comment_detail_url}` не удаляет комментарий.'
         )
+
+    def test_comments_list_num_queries(self, user_client, post,
+                                       comment_1_post, comment_2_post,
+                                       django_assert_num_queries):
+        # Пользователь из токена и комментарии вместе с авторами.
+        with django_assert_num_queries(2):
+            response = user_client.get(
+                self.comments_url.format(post_id=post.id)
+            )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.comments_url}` получает '
+            'комментарии и их авторов одним запросом к базе.'
+        )
+
+    def test_comments_list_post_not_found(self, user_client, post,
+                                          django_assert_num_queries):
+        with django_assert_num_queries(3):
+            response = user_client.get(
+                self.comments_url.format(post_id=post.id + 100)
+            )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что GET-запрос к `{self.comments_url}` для '
+            'несуществующего поста возвращает ответ со статусом 404.'
+        )
+
+    def test_comment_create_num_queries(self, user_client, post,
+                                        django_assert_num_queries):
+        # Пользователь из токена, BEGIN, проверка поста, INSERT
+        # комментария и записи журнала изменений, счётчик автора.
+        with django_assert_num_queries(6):
+            response = user_client.post(
+                self.comments_url.format(post_id=post.id),
+                data={'text': self.TEXT_FOR_COMMENT}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json().get('post') == post.id, (
+            f'Проверьте, что POST-запрос к `{self.comments_url}` возвращает '
+            '`id` поста, к которому создан комментарий.'
+        )
+
+    def test_comment_create_post_not_found(self, user_client, post):
+        comments_count = Comment.objects.count()
+        response = user_client.post(
+            self.comments_url.format(post_id=post.id + 100),
+            data={'text': self.TEXT_FOR_COMMENT}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что POST-запрос к `{self.comments_url}` для '
+            'несуществующего поста возвращает ответ со статусом 404.'
+        )
+        assert comments_count == Comment.objects.count()
+
+    def test_comment_detail_num_queries(self, user_client, post,
+                                        comment_1_post,
+                                        django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = user_client.get(
+                self.comment_detail_url.format(
+                    post_id=post.id, comment_id=comment_1_post.id
+                )
+            )
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,87 @@
+import gzip
+import json
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory
+import pytest
+
+from posts.models import Post
+from yatube_api.middleware import CompressionMiddleware
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCompression:
+
+    post_list_url = '/api/v1/posts/'
+
+    def test_large_response_is_gzipped(self, client, user):
+        Post.objects.bulk_create(
+            Post(text='Длинный текст поста. ' * 20, author=user)
+            for _ in range(10)
+        )
+        response = client.get(
+            self.post_list_url, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что большие ответы API сжимаются gzip, если клиент '
+            'его поддерживает.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        data = json.loads(gzip.decompress(response.content))
+        assert len(data) == 10
+
+    def test_small_response_is_not_compressed(self, client, post):
+        response = client.get(
+            f'{self.post_list_url}{post.id}/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы меньше `COMPRESSION_MIN_SIZE` не сжимаются.'
+        )
+
+    def test_gzip_refused_by_client(self, client, user):
+        Post.objects.bulk_create(
+            Post(text='Длинный текст поста. ' * 20, author=user)
+            for _ in range(10)
+        )
+        response = client.get(
+            self.post_list_url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity'
+        )
+        assert not response.has_header('Content-Encoding')
+
+
+def test_streaming_response_is_compressed_in_chunks():
+    chunks = [b'{"id": %d}\n' % i for i in range(1000)]
+    middleware = CompressionMiddleware(
+        lambda request: StreamingHttpResponse(
+            iter(chunks), content_type='application/json')
+    )
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+    response = middleware(request)
+    assert response['Content-Encoding'] == 'gzip'
+    assert not response.has_header('Content-Length')
+    assert gzip.decompress(b''.join(response.streaming_content)) == (
+        b''.join(chunks)
+    )
+
+
+def test_middleware_imports_without_settings():
+    # Так модуль импортирует benchmarks/bench_compression.py.
+    env = {
+        key: value for key, value in os.environ.items()
+        if key != 'DJANGO_SETTINGS_MODULE'
+    }
+    result = subprocess.run(
+        [sys.executable, '-c', 'import yatube_api.middleware'],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, (
+        'Проверьте, что `yatube_api.middleware` импортируется без '
+        f'настроенного Django:\n{result.stderr}'
+    )
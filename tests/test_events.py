@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from api.events import InProcessBroker, comments_channel
+from api.streams import CommentStreamApplication
+
+
+def stream_scope(post_id, last_event_id=None):
+    headers = []
+    if last_event_id is not None:
+        headers.append((b'last-event-id', str(last_event_id).encode()))
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': f'/api/v1/posts/{post_id}/comments/stream/',
+        'headers': headers,
+    }
+
+
+class RecordingBroker:
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, event):
+        self.published.append((channel, event))
+
+
+class TestInProcessBroker:
+
+    def test_slow_subscriber_drops_oldest(self):
+        async def run():
+            broker = InProcessBroker(buffer_size=2)
+            subscription = broker.subscribe('channel')
+            for number in range(5):
+                broker.publish('channel', number)
+            await asyncio.sleep(0)
+            events = [await subscription.get(), await subscription.get()]
+            subscription.close()
+            return events, subscription.dropped, broker.has_subscribers()
+
+        events, dropped, has_subscribers = asyncio.run(run())
+        assert events == [3, 4], (
+            'Проверьте, что при переполнении буфера подписки вытесняются '
+            'самые старые события.'
+        )
+        assert dropped == 3
+        assert not has_subscribers, (
+            'Проверьте, что `close()` снимает подписку.'
+        )
+
+    def test_publish_from_another_thread(self):
+        async def run():
+            broker = InProcessBroker(buffer_size=10)
+            subscription = broker.subscribe('channel')
+            other = broker.subscribe('other')
+            thread = threading.Thread(
+                target=broker.publish, args=('channel', 'event'))
+            thread.start()
+            event = await asyncio.wait_for(subscription.get(), 1)
+            return event, other.queue.qsize()
+
+        event, other_size = asyncio.run(run())
+        assert event == 'event', (
+            'Проверьте, что `publish()` можно вызывать из другого потока.'
+        )
+        assert other_size == 0, (
+            'Проверьте, что событие получают только подписчики его канала.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCommentStream:
+
+    def stream(self, post_id, last_event_id=None, publish=None):
+        """Читаем поток, пока не придёт первое событие с комментарием."""
+        async def run():
+            sent = []
+            done = asyncio.Event()
+            started = asyncio.Event()
+
+            async def receive():
+                await done.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if message['type'] == 'http.response.start':
+                    started.set()
+                elif (not message.get('more_body')
+                        or b'event: comment' in message['body']):
+                    done.set()
+
+            application = CommentStreamApplication(None)
+            task = asyncio.ensure_future(application(
+                stream_scope(post_id, last_event_id), receive, send))
+            if publish is not None:
+                await started.wait()
+                publish()
+            await asyncio.wait_for(task, 5)
+            return sent
+
+        return async_to_sync(run)()
+
+    def test_unknown_post(self, post):
+        sent = self.stream(post.id + 100)
+        assert sent[0]['status'] == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что поток комментариев несуществующего поста '
+            'возвращает 404.'
+        )
+
+    def test_backfill_after_last_event_id(self, comment_1_post,
+                                          comment_2_post):
+        sent = self.stream(
+            comment_1_post.post_id, last_event_id=comment_1_post.id)
+        headers = dict(sent[0]['headers'])
+        assert sent[0]['status'] == HTTPStatus.OK
+        assert headers[b'content-type'].startswith(b'text/event-stream')
+        body = sent[1]['body'].decode()
+        assert body.startswith(f'id: {comment_2_post.id}\n'), (
+            'Проверьте, что при переподключении с `Last-Event-ID` поток '
+            'начинается с пропущенных комментариев.'
+        )
+        data = json.loads(body.split('data: ', 1)[1])
+        assert data['text'] == comment_2_post.text
+
+    def test_live_event(self, post):
+        from api.events import get_broker
+
+        event = {'id': 1, 'text': 'Новый', 'post': post.id}
+        sent = self.stream(post.id, publish=lambda: get_broker().publish(
+            comments_channel(post.id), event))
+        assert sent[1]['body'].startswith(b'id: 1\nevent: comment\n'), (
+            'Проверьте, что новые комментарии приходят в поток.'
+        )
+
+    def test_create_publishes_after_commit(self, user_client, post,
+                                           monkeypatch):
+        broker = RecordingBroker()
+        monkeypatch.setattr('api.events._broker', broker)
+        response = user_client.post(
+            f'/api/v1/posts/{post.id}/comments/', data={'text': 'Коммент'})
+        assert response.status_code == HTTPStatus.CREATED
+        assert broker.published == [
+            (comments_channel(post.id), response.json())
+        ], (
+            'Проверьте, что созданный комментарий публикуется брокеру '
+            'после фиксации транзакции.'
+        )
@@ -1,7 +1,12 @@
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError
 
+from posts.counters import group_posts, post_views
 from posts.models import Group
 
 
@@ -113,3 +118,186 @@ class TestGroupAPI:
             'виде словаря.'
         )
         self.check_group_info(test_data, '/api/v1/groups/{group_id}/')
+
+    def test_group_posts_count(self, user_client, group_1, group_2):
+        for _ in range(2):
+            response = user_client.post(
+                '/api/v1/posts/', data={'text': 'Пост', 'group': group_1.id}
+            )
+        moved_id = response.json()['id']
+        user_client.patch(
+            f'/api/v1/posts/{moved_id}/', data={'group': group_2.id}
+        )
+        response = user_client.post(
+            '/api/v1/posts/', data={'text': 'Пост', 'group': group_2.id}
+        )
+        user_client.delete(f'/api/v1/posts/{response.json()["id"]}/')
+        group_posts.flush()
+
+        response = user_client.get(
+            self.group_detail_url.format(group_id=group_1.id)
+        )
+        assert response.json()['posts_count'] == 1, (
+            'Проверьте, что ответ на GET-запрос к '
+            f'`{self.group_detail_url}` содержит поле `posts_count` с '
+            'числом постов группы.'
+        )
+        group_2.refresh_from_db()
+        assert group_2.posts_count == 1
+
+    def test_group_stats(self, user_client, group_1, group_2):
+        for group in (group_1, group_1, group_2):
+            response = user_client.post(
+                '/api/v1/posts/', data={'text': 'Пост', 'group': group.id}
+            )
+        user_client.delete(f'/api/v1/posts/{response.json()["id"]}/')
+        group_posts.flush()
+
+        url = f'/api/v1/groups/{group_1.slug}/stats/'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статистику '
+            'группы со статусом 200.'
+        )
+        stats = response.json()
+        assert stats['posts_count'] == 2
+        assert stats['posts_last_day'] == stats['posts_last_week'] == 2, (
+            'Проверьте, что статистика группы считает посты за сутки и '
+            'неделю.'
+        )
+        assert stats['last_post_at'] is not None
+        response = user_client.get(f'/api/v1/groups/{group_2.slug}/stats/')
+        assert response.json()['posts_last_day'] == 0, (
+            'Проверьте, что удалённый пост не учитывается в статистике.'
+        )
+        response = user_client.get('/api/v1/groups/unknown/stats/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_trending(self, user_client, group_1, group_2):
+        for group in (group_1, group_2, group_2):
+            user_client.post(
+                '/api/v1/posts/', data={'text': 'Пост', 'group': group.id}
+            )
+        response = user_client.get('/api/v1/groups/trending/?hours=1')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {'slug': group_2.slug, 'title': group_2.title,
+             'recent_posts': 2},
+            {'slug': group_1.slug, 'title': group_1.title,
+             'recent_posts': 1},
+        ], (
+            'Проверьте, что `/api/v1/groups/trending/` возвращает группы '
+            'по убыванию числа недавних постов.'
+        )
+        response = user_client.get('/api/v1/groups/trending/?limit=1')
+        assert len(response.json()) == 1
+        response = user_client.get('/api/v1/groups/trending/?hours=x')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_refresh_rollups(self, client, post, post_2, another_post):
+        call_command('refresh_rollups', stdout=StringIO())
+        response = client.get('/api/v1/groups/trending/')
+        assert [group['recent_posts'] for group in response.json()] == [
+            2, 1
+        ], (
+            'Проверьте, что команда `refresh_rollups` пересчитывает '
+            'активность групп из постов.'
+        )
+        post.group.refresh_from_db()
+        assert post.group.last_post_at == post_2.pub_date
+
+    def test_refresh_rollups_rebuilds_posts_count(self, post, post_2):
+        Group.objects.filter(pk=post.group_id).update(posts_count=5)
+        call_command('refresh_rollups', stdout=StringIO())
+        post.group.refresh_from_db()
+        assert post.group.posts_count == 2, (
+            'Проверьте, что команда `refresh_rollups` пересчитывает '
+            '`posts_count` групп из опубликованных постов.'
+        )
+
+    def test_last_post_at_after_delete_and_move(self, user_client, group_1,
+                                                group_2):
+        ids = [
+            user_client.post(
+                '/api/v1/posts/', data={'text': 'Пост', 'group': group_1.id}
+            ).json()['id']
+            for _ in range(3)
+        ]
+        user_client.delete(f'/api/v1/posts/{ids[2]}/')
+        user_client.patch(
+            f'/api/v1/posts/{ids[1]}/', data={'group': group_2.id})
+        stats = user_client.get(
+            f'/api/v1/groups/{group_1.slug}/stats/').json()
+        first = user_client.get(f'/api/v1/posts/{ids[0]}/').json()
+        assert stats['last_post_at'] == first['pub_date'], (
+            'Проверьте, что после удаления или переноса последнего поста '
+            '`last_post_at` группы указывает на оставшийся последний пост.'
+        )
+        user_client.delete(f'/api/v1/posts/{ids[0]}/')
+        stats = user_client.get(
+            f'/api/v1/groups/{group_1.slug}/stats/').json()
+        assert stats['last_post_at'] is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGroupPostsCounter:
+
+    def test_counter_does_not_go_below_zero(self, group_1):
+        group_posts.increment(group_1.pk, -2)
+        group_posts.flush()
+        group_1.refresh_from_db()
+        assert group_1.posts_count == 0, (
+            'Проверьте, что счётчик постов группы не уходит ниже нуля.'
+        )
+
+    def test_failed_flush_keeps_deltas(self, group_1, monkeypatch):
+        group_posts.increment(group_1.pk, 3)
+
+        def failing_update(items):
+            raise DatabaseError('база недоступна')
+
+        monkeypatch.setattr(group_posts, '_update', failing_update)
+        with pytest.raises(DatabaseError):
+            group_posts.flush()
+        monkeypatch.undo()
+        group_posts.flush()
+        group_1.refresh_from_db()
+        assert group_1.posts_count == 3, (
+            'Проверьте, что приращения, которые не удалось записать, '
+            'запишутся при следующем сбросе.'
+        )
+
+    def test_rolled_back_create_keeps_counter(self, user_client, group_1,
+                                              monkeypatch):
+        def failing_activity(*args, **kwargs):
+            raise DatabaseError('база недоступна')
+
+        # Счётчик группы уже увеличен, когда транзакция падает.
+        monkeypatch.setattr(
+            'posts.publishing.add_group_activity', failing_activity)
+        with pytest.raises(DatabaseError):
+            user_client.post(
+                '/api/v1/posts/', data={'text': 'Пост', 'group': group_1.id})
+        group_posts.flush()
+        group_1.refresh_from_db()
+        assert group_1.posts_count == 0, (
+            'Проверьте, что приращения счётчика из откатившейся транзакции '
+            'не записываются.'
+        )
+
+    def test_failed_flush_does_not_break_request(self, client, post,
+                                                 monkeypatch):
+        monkeypatch.setattr(settings, 'COUNTERS_MAX_KEYS', 1)
+
+        def failing_update(items):
+            raise DatabaseError('database is locked')
+
+        monkeypatch.setattr(post_views, '_update', failing_update)
+        response = client.get(f'/api/v1/posts/{post.id}/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ошибка записи счётчика не ломает запрос.'
+        )
+        assert len(post_views._pending) <= 1, (
+            'Проверьте, что после неудачной записи в памяти остаётся не '
+            'больше `COUNTERS_MAX_KEYS` ключей.'
+        )
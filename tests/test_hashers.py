@@ -0,0 +1,87 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.hashers import check_password, make_password
+
+from yatube_api.hashers import PBKDF2PasswordHasher, ScryptPasswordHasher
+
+SCRYPT = 'yatube_api.hashers.ScryptPasswordHasher'
+MD5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+
+
+@pytest.fixture
+def cheap_scrypt(settings):
+    settings.PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 10
+    settings.PASSWORD_SCRYPT_BLOCK_SIZE = 8
+    settings.PASSWORD_SCRYPT_PARALLELISM = 1
+
+
+class TestHashers:
+
+    def test_scrypt_roundtrip(self, cheap_scrypt, settings):
+        settings.PASSWORD_HASHERS = [SCRYPT]
+        encoded = make_password('secret')
+        assert encoded.startswith('scrypt$1024$')
+        assert check_password('secret', encoded)
+        assert not check_password('wrong', encoded)
+
+        hasher = ScryptPasswordHasher()
+        assert not hasher.must_update(encoded)
+        settings.PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 11
+        assert hasher.must_update(encoded), (
+            'Проверьте, что пароль перехэшируется после смены параметров '
+            'scrypt.'
+        )
+
+    def test_pbkdf2_iterations_from_settings(self, settings):
+        settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+        hasher = PBKDF2PasswordHasher()
+        encoded = hasher.encode('secret', hasher.salt())
+        assert encoded.startswith('pbkdf2_sha256$1000$')
+        settings.PASSWORD_PBKDF2_ITERATIONS = 2000
+        assert hasher.must_update(encoded)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestLogin:
+    url_create = '/api/v1/jwt/create/'
+
+    def test_rehash_on_login(self, client, user, cheap_scrypt, settings):
+        assert user.password.startswith('md5$')
+        settings.PASSWORD_HASHERS = [SCRYPT, MD5]
+        response = client.post(
+            self.url_create,
+            data={'username': user.username, 'password': '1234567'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.password.startswith('scrypt$'), (
+            'Проверьте, что при успешном входе пароль перехэшируется '
+            'основным хэшером из `PASSWORD_HASHERS`.'
+        )
+        assert user.check_password('1234567')
+
+    def test_login_runs_in_hash_pool(self, client, user, monkeypatch):
+        from api import tokens
+
+        threads = []
+        view = tokens._token_obtain_pair
+
+        def recording_view(request, *args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return view(request, *args, **kwargs)
+
+        monkeypatch.setattr(tokens, '_token_obtain_pair', recording_view)
+        response = client.post(
+            self.url_create,
+            data={'username': user.username, 'password': '1234567'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert threads[0].startswith('password-hash'), (
+            'Проверьте, что пароль проверяется в пуле потоков для хэширования.'
+        )
+        assert response['Server-Timing'].startswith('login-cpu;dur='), (
+            'Проверьте, что процессорное время входа отдаётся в заголовке '
+            '`Server-Timing`.'
+        )
@@ -0,0 +1,101 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from posts.models import Comment, Follow, Post
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestIdempotencyKey:
+    post_url = '/api/v1/posts/'
+
+    def post(self, client, url, data, key):
+        return client.post(url, data=data, HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_response(self, user_client,
+                                    django_assert_num_queries):
+        data = {'text': 'Пост'}
+        first = self.post(user_client, self.post_url, data, 'key-1')
+        assert first.status_code == HTTPStatus.CREATED
+        # Только пользователь из токена.
+        with django_assert_num_queries(1):
+            second = self.post(user_client, self.post_url, data, 'key-1')
+        assert second.status_code == HTTPStatus.CREATED
+        assert second.json() == first.json(), (
+            'Проверьте, что повтор запроса с тем же `Idempotency-Key` '
+            'возвращает сохранённый ответ.'
+        )
+        assert second['Idempotent-Replayed'] == 'true'
+        assert Post.objects.count() == 1, (
+            'Проверьте, что повтор запроса не создаёт дубликат.'
+        )
+        self.post(user_client, self.post_url, data, 'key-2')
+        assert Post.objects.count() == 2
+
+    def test_key_reused_with_other_body(self, user_client):
+        self.post(user_client, self.post_url, {'text': 'Пост'}, 'key')
+        response = self.post(
+            user_client, self.post_url, {'text': 'Другой'}, 'key')
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+        assert Post.objects.count() == 1
+
+    def test_keys_are_per_user(self, user_client, user_2):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        client_2 = APIClient()
+        client_2.credentials(HTTP_AUTHORIZATION='Bearer ' + str(
+            RefreshToken.for_user(user_2).access_token))
+        data = {'text': 'Пост'}
+        self.post(user_client, self.post_url, data, 'key')
+        response = self.post(client_2, self.post_url, data, 'key')
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user_2.username
+        assert Post.objects.count() == 2
+
+    def test_failed_request_is_not_stored(self, user_client):
+        response = self.post(user_client, self.post_url, {}, 'key')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = self.post(user_client, self.post_url, {}, 'key')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'Idempotent-Replayed' not in response
+
+    def test_comment_and_follow(self, user_client, post, user_2):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        for _ in range(2):
+            response = self.post(
+                user_client, url, {'text': 'Коммент'}, 'comment')
+            assert response.status_code == HTTPStatus.CREATED
+        assert Comment.objects.count() == 1
+        for _ in range(2):
+            response = self.post(
+                user_client, '/api/v1/follow/',
+                {'following': user_2.username}, 'follow')
+            assert response.status_code == HTTPStatus.CREATED, (
+                'Проверьте, что повтор подписки с тем же `Idempotency-Key` '
+                'не падает на проверке уникальности.'
+            )
+        assert Follow.objects.count() == 1
+
+    def test_abandoned_request_releases_key(self, user_client, settings,
+                                            monkeypatch):
+        settings.IDEMPOTENCY_LOCK_TTL = 1
+        # Воркер упал посреди запроса: отметку о нём никто не удалил.
+        monkeypatch.setattr(cache, 'delete', lambda key: None)
+        self.post(user_client, self.post_url, {}, 'key')
+        response = self.post(user_client, self.post_url, {}, 'key')
+        assert response.status_code == HTTPStatus.CONFLICT
+        time.sleep(1.1)
+        response = self.post(user_client, self.post_url, {}, 'key')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что отметка о выполняющемся запросе хранится '
+            '`IDEMPOTENCY_LOCK_TTL` секунд, а не всё время жизни ключа.'
+        )
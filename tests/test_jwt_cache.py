@@ -0,0 +1,119 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework_simplejwt.state import token_backend
+
+from api.authentication import TokenCache
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    decode = token_backend.decode
+
+    def counting_decode(token, verify=True):
+        calls.append(token)
+        return decode(token, verify)
+
+    monkeypatch.setattr(token_backend, 'decode', counting_decode)
+    return calls
+
+
+class TestTokenCache:
+
+    def test_entry_lives_no_longer_than_token(self, settings):
+        settings.JWT_VERIFY_CACHE_TTL = 300
+        tokens = TokenCache('JWT_VERIFY_CACHE_TTL')
+        tokens.set('expired', 'value', token_exp=time.time() - 1)
+        tokens.set('valid', 'value', token_exp=time.time() + 60)
+        assert tokens.get('expired') is None, (
+            'Проверьте, что запись кэша не переживает срок действия токена.'
+        )
+        assert tokens.get('valid') == 'value'
+
+    def test_size_is_bounded(self, settings):
+        settings.JWT_VERIFY_CACHE_TTL = 300
+        settings.JWT_CACHE_MAX_SIZE = 2
+        tokens = TokenCache('JWT_VERIFY_CACHE_TTL')
+        for name in ('a', 'b', 'c'):
+            tokens.set(name, name)
+        assert tokens.get('a') is None, (
+            'Проверьте, что при переполнении вытесняются старые записи.'
+        )
+        assert tokens.get('c') == 'c'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestJWTCache:
+    url_refresh = '/api/v1/jwt/refresh/'
+    url_verify = '/api/v1/jwt/verify/'
+
+    def test_verify_decodes_token_once(self, client, token, decode_calls):
+        for _ in range(3):
+            response = client.post(
+                self.url_verify, data={'token': token['access']})
+            assert response.status_code == HTTPStatus.OK
+        assert len(decode_calls) == 1, (
+            'Проверьте, что повторная проверка того же токена берёт '
+            'результат из кэша.'
+        )
+
+    def test_invalid_token_is_not_cached(self, client, token, decode_calls):
+        invalid = token['access'][:-2] + 'xx'
+        for _ in range(2):
+            response = client.post(self.url_verify, data={'token': invalid})
+            assert response.status_code == HTTPStatus.UNAUTHORIZED
+        assert len(decode_calls) == 2
+
+    def test_authentication_uses_cache(self, user_client, decode_calls):
+        user_client.get('/api/v1/follow/')
+        user_client.get('/api/v1/follow/')
+        assert len(decode_calls) == 1, (
+            'Проверьте, что аутентификация не проверяет подпись знакомого '
+            'токена повторно.'
+        )
+
+    def test_repeated_refresh_is_coalesced(self, client, token):
+        first = client.post(
+            self.url_refresh, data={'refresh': token['refresh']})
+        second = client.post(
+            self.url_refresh, data={'refresh': token['refresh']})
+        assert first.status_code == second.status_code == HTTPStatus.OK
+        assert first.json() == second.json(), (
+            'Проверьте, что повторное обновление того же refresh-токена '
+            'отдаёт уже выданный access-токен.'
+        )
+
+    def test_refresh_is_throttled(self, client, token, monkeypatch):
+        monkeypatch.setattr(ScopedRateThrottle, 'THROTTLE_RATES',
+                            {'jwt_refresh': '2/min'})
+        cache.clear()
+        statuses = [
+            client.post(
+                self.url_refresh, data={'refresh': token['refresh']}
+            ).status_code
+            for _ in range(3)
+        ]
+        cache.clear()
+        assert statuses == [
+            HTTPStatus.OK, HTTPStatus.OK, HTTPStatus.TOO_MANY_REQUESTS
+        ], 'Проверьте, что частота обновления токенов ограничена.'
+
+    def test_public_key(self, client, settings):
+        url = '/api/v1/jwt/public-key/'
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что при симметричной подписи открытого ключа нет.'
+        )
+        settings.SIMPLE_JWT = {
+            **settings.SIMPLE_JWT,
+            'ALGORITHM': 'RS256',
+            'VERIFYING_KEY': 'public',
+        }
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'algorithm': 'RS256', 'public_key': 'public'
+        }
@@ -1,9 +1,12 @@
 from http import HTTPStatus
+from io import StringIO
 
+from django.core.management import call_command
 from django.db.utils import IntegrityError
 import pytest
 
-from posts.models import Post
+from posts.counters import post_views
+from posts.models import Comment, Post
 
 
 @pytest.mark.django_db(transaction=True)
@@ -372,3 +375,165 @@ class TestPostAPI:
             'Проверьте, что DELETE-запрос неавторизованного пользователя '
             f'к `{self.post_detail_url}` не удаляет запрошенный пост.'
         )
+
+    def test_post_change_by_author_num_queries(self, user_client, post,
+                                               django_assert_num_queries):
+        # Пользователь из токена, пост с автором, BEGIN, UPDATE и запись
+        # журнала изменений.
+        with django_assert_num_queries(5):
+            response = user_client.patch(
+                self.post_detail_url.format(post_id=post.id),
+                data=self.VALID_DATA
+            )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что проверка авторства при PATCH-запросе к '
+            f'`{self.post_detail_url}` не требует отдельного запроса '
+            'к автору поста.'
+        )
+
+    def test_post_delete_is_soft_then_purged(self, user_client, post,
+                                             comment_1_post, comment_2_post,
+                                             another_post,
+                                             comment_1_another_post):
+        response = user_client.delete(
+            self.post_detail_url.format(post_id=post.id)
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert Post.all_objects.filter(id=post.id).exists(), (
+            'Проверьте, что DELETE-запрос к `/api/v1/posts/{id}/` только '
+            'помечает пост удалённым.'
+        )
+        response = user_client.get(
+            f'/api/v1/posts/{post.id}/comments/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии удалённого поста недоступны.'
+        )
+
+        out = StringIO()
+        call_command('purge_deleted_posts', batch_size=1, stdout=out)
+        assert 'posts=1 comments=2' in out.getvalue()
+        assert not Post.all_objects.filter(id=post.id).exists()
+        assert not Comment.objects.filter(post_id=post.id).exists()
+        assert Comment.objects.filter(post=another_post).count() == 1, (
+            'Проверьте, что очистка не затрагивает комментарии '
+            'неудалённых постов.'
+        )
+
+    def test_posts_sparse_fields(self, client, post, another_post,
+                                 django_assert_num_queries):
+        with django_assert_num_queries(1) as captured:
+            response = client.get(
+                self.post_list_url, {'fields': 'id,pub_date'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        for post_data in response.json():
+            assert set(post_data) == {'id', 'pub_date'}, (
+                'Проверьте, что `?fields=` оставляет в ответе только '
+                'перечисленные поля поста.'
+            )
+        sql = captured.captured_queries[0]['sql']
+        assert '"posts_post"."text"' not in sql, (
+            'Проверьте, что при `?fields=` из базы выбираются только '
+            'нужные колонки.'
+        )
+
+    def test_posts_unknown_field(self, client, post):
+        response = client.get(self.post_list_url, {'fields': 'id,secret'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_posts_expand(self, client, post, another_post, comment_1_post,
+                          comment_2_post, comment_1_another_post,
+                          django_assert_num_queries):
+        # Посты с авторами и группами, затем превью комментариев.
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.post_list_url,
+                {'expand': 'group,author,comments_preview'}
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = {item['id']: item for item in response.json()}
+        assert data[post.id]['group']['slug'] == post.group.slug
+        assert data[post.id]['author']['username'] == post.author.username
+        assert [c['id'] for c in data[post.id]['comments_preview']] == [
+            comment_2_post.id, comment_1_post.id
+        ], (
+            'Проверьте, что `?expand=comments_preview` встраивает последние '
+            'комментарии поста, начиная с новых.'
+        )
+        assert len(data[another_post.id]['comments_preview']) == 1
+
+    def test_posts_expand_large_dataset(self, client, large_dataset,
+                                        django_assert_num_queries):
+        # Подсчёт, страница постов с авторами и группами, превью.
+        with django_assert_num_queries(3):
+            response = client.get(
+                self.post_list_url,
+                {'expand': 'group,author,comments_preview', 'limit': 100}
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == len(large_dataset.posts)
+        assert len(data['results']) == 100
+        assert all(
+            len(item['comments_preview']) == 3 for item in data['results']
+        ), (
+            'Проверьте, что превью комментариев не зависит от числа постов '
+            'в базе.'
+        )
+
+    def test_post_expand_with_fields(self, client, post):
+        response = client.get(
+            self.post_detail_url.format(post_id=post.id),
+            {'fields': 'id', 'expand': 'group'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()) == {'id', 'group'}
+        assert response.json()['group']['title'] == post.group.title
+
+    def test_posts_batch_by_ids(self, user_client, post, post_2,
+                                another_post, django_assert_num_queries):
+        ids = [another_post.id, post.id + 1000, post.id]
+        with django_assert_num_queries(2):
+            response = user_client.get(
+                self.post_list_url,
+                {'ids': ','.join(map(str, ids))}
+            )
+        assert response.status_code == HTTPStatus.OK
+        test_data = response.json()
+        assert [item['id'] for item in test_data['results']] == [
+            another_post.id, post.id
+        ], (
+            'Проверьте, что `?ids=` возвращает посты в порядке запроса.'
+        )
+        assert test_data['missing'] == [post.id + 1000], (
+            'Проверьте, что `?ids=` сообщает id ненайденных постов.'
+        )
+
+    @pytest.mark.parametrize(
+        'ids', ('1,x', '1,²', '١', ','.join(str(i) for i in range(1, 102)))
+    )
+    def test_posts_batch_invalid_ids(self, client, post, ids):
+        response = client.get(self.post_list_url, {'ids': ids})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_post_views_are_counted_in_batches(self, client, post,
+                                               another_post,
+                                               django_assert_num_queries):
+        for _ in range(3):
+            client.get(self.post_detail_url.format(post_id=post.id))
+        client.get(self.post_detail_url.format(post_id=another_post.id))
+        post.refresh_from_db()
+        assert post.views_count == 0, (
+            'Проверьте, что просмотры не пишутся в базу на каждый запрос.'
+        )
+
+        with django_assert_num_queries(1):
+            assert post_views.flush() == 2
+        response = client.get(self.post_detail_url.format(post_id=post.id))
+        assert response.json()['views_count'] == 3, (
+            'Проверьте, что ответ на GET-запрос к `/api/v1/posts/{id}/` '
+            'содержит поле `views_count` с числом просмотров.'
+        )
+        another_post.refresh_from_db()
+        assert another_post.views_count == 1
@@ -0,0 +1,52 @@
+import importlib
+from http import HTTPStatus
+
+from django.test import override_settings
+import pytest
+
+
+@pytest.fixture
+def production_settings(monkeypatch):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'test-secret')
+    monkeypatch.setenv('DJANGO_ALLOWED_HOSTS', 'testserver example.com')
+    from yatube_api import settings_production
+    return importlib.reload(settings_production)
+
+
+def test_production_settings(production_settings):
+    assert production_settings.DEBUG is False, (
+        'Проверьте, что в `settings_production` отключён `DEBUG`.'
+    )
+    assert production_settings.SECRET_KEY == 'test-secret'
+    assert production_settings.DATABASES['default']['CONN_MAX_AGE'] == 60, (
+        'Проверьте, что в `settings_production` соединения с базой '
+        'переиспользуются между запросами.'
+    )
+    assert production_settings.ALLOWED_HOSTS == ['testserver', 'example.com']
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAPIMiddlewareBypass:
+
+    def test_api_skips_browser_middleware(self, production_settings, client,
+                                          post):
+        with override_settings(MIDDLEWARE=production_settings.MIDDLEWARE):
+            response = client.get('/api/v1/posts/')
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('X-Frame-Options'), (
+            'Проверьте, что для запросов к API не работает '
+            '`XFrameOptionsMiddleware`.'
+        )
+        assert not hasattr(response.wsgi_request, 'session'), (
+            'Проверьте, что для запросов к API не работают сессии.'
+        )
+
+    def test_admin_keeps_browser_middleware(self, production_settings,
+                                            admin_client):
+        with override_settings(MIDDLEWARE=production_settings.MIDDLEWARE):
+            response = admin_client.get('/admin/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что админка работает с сессиями в '
+            '`settings_production`.'
+        )
+        assert response['X-Frame-Options'] == 'DENY'
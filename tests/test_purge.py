@@ -0,0 +1,47 @@
+from io import StringIO
+
+from django.core.management import call_command
+import pytest
+
+from posts.models import Comment, Follow, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUserPurge:
+
+    def check_user_purged(self, user, another_user, another_post):
+        assert not type(user).objects.filter(pk=user.pk).exists(), (
+            'Проверьте, что пользователь удалён.'
+        )
+        assert not Post.all_objects.filter(author_id=user.pk).exists()
+        assert not Comment.objects.filter(author_id=user.pk).exists()
+        assert not Follow.objects.filter(user_id=user.pk).exists()
+        assert not Follow.objects.filter(following_id=user.pk).exists()
+        assert Post.objects.filter(pk=another_post.pk).exists(), (
+            'Проверьте, что посты других пользователей не удаляются.'
+        )
+        assert type(user).objects.filter(pk=another_user.pk).exists()
+
+    def test_purge_user_command(self, user, another_user, post,
+                                another_post, comment_1_post,
+                                comment_2_post, comment_1_another_post,
+                                follow_1, follow_4):
+        out = StringIO()
+        call_command('purge_user', user.username, batch_size=1, stdout=out)
+        self.check_user_purged(user, another_user, another_post)
+        output = out.getvalue()
+        assert 'rows/s' in output, (
+            'Проверьте, что команда `purge_user` сообщает скорость удаления.'
+        )
+        assert 'comments deleted=1' in output
+
+    def test_purge_user_admin_action(self, admin_client, user, another_user,
+                                     post, another_post, comment_2_post,
+                                     follow_1):
+        response = admin_client.post(
+            '/admin/auth/user/',
+            {'action': 'purge_selected', '_selected_action': [user.pk]},
+            follow=True
+        )
+        assert response.status_code == 200
+        self.check_user_purged(user, another_user, another_post)
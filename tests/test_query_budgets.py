@@ -0,0 +1,216 @@
+"""Бюджеты SQL-запросов для каждого маршрута `api/urls.py`.
+
+Число запросов сверяется точно: и лишний запрос, и бюджет, который код
+больше не тратит, роняют тест.
+
+Запросы с токеном тратят один запрос на загрузку пользователя,
+изменения в атомарных view — ещё по запросу на BEGIN, на запись в
+журнал изменений и на каждый затронутый счётчик.
+"""
+import re
+from http import HTTPStatus
+
+import pytest
+from django.urls import URLResolver, get_resolver, resolve
+
+from posts.models import Change, Comment, Follow
+
+from .fixtures.fixture_dataset import insert_dataset
+
+PASSWORD = '1234567'
+NEW_PASSWORD = 'Sup3r-secret-pass'
+
+# (метод, URL, клиент, данные, ожидаемый статус, число запросов)
+ROUTE_BUDGETS = [
+    ('get', '/api/v1/', 'client', None, HTTPStatus.UNAUTHORIZED, 0),
+    ('get', '/api/v1/posts/', 'client', None, HTTPStatus.OK, 1),
+    ('post', '/api/v1/posts/', 'user_client', {'text': 'Пост'},
+     HTTPStatus.CREATED, 5),
+    ('get', '/api/v1/posts/{post}/', 'client', None, HTTPStatus.OK, 1),
+    ('put', '/api/v1/posts/{post}/', 'user_client', {'text': 'Пост'},
+     HTTPStatus.OK, 5),
+    ('patch', '/api/v1/posts/{post}/', 'user_client', {'text': 'Пост'},
+     HTTPStatus.OK, 5),
+    ('delete', '/api/v1/posts/{post}/', 'user_client', None,
+     HTTPStatus.NO_CONTENT, 8),
+    ('get', '/api/v1/posts/{post}/comments/', 'client', None,
+     HTTPStatus.OK, 1),
+    ('post', '/api/v1/posts/{post}/comments/', 'user_client',
+     {'text': 'Коммент'}, HTTPStatus.CREATED, 6),
+    ('get', '/api/v1/posts/{post}/comments/{comment}/', 'client', None,
+     HTTPStatus.OK, 1),
+    ('put', '/api/v1/posts/{post}/comments/{comment}/', 'user_client',
+     {'text': 'Коммент'}, HTTPStatus.OK, 5),
+    ('patch', '/api/v1/posts/{post}/comments/{comment}/', 'user_client',
+     {'text': 'Коммент'}, HTTPStatus.OK, 5),
+    ('delete', '/api/v1/posts/{post}/comments/{comment}/', 'user_client',
+     None, HTTPStatus.NO_CONTENT, 6),
+    ('get', '/api/v1/groups/', 'client', None, HTTPStatus.OK, 1),
+    ('get', '/api/v1/groups/{group}/', 'client', None, HTTPStatus.OK, 1),
+    ('get', '/api/v1/groups/{group_slug}/stats/', 'client', None,
+     HTTPStatus.OK, 2),
+    ('get', '/api/v1/groups/trending/', 'client', None, HTTPStatus.OK, 1),
+    ('get', '/api/v1/authors/{username}/', 'client', None,
+     HTTPStatus.OK, 2),
+    ('get', '/api/v1/follow/', 'user_client', None, HTTPStatus.OK, 2),
+    ('post', '/api/v1/follow/', 'user_client',
+     {'following': '{user_2}'}, HTTPStatus.CREATED, 8),
+    ('get', '/api/v1/changes/', 'staff_client', None, HTTPStatus.OK, 2),
+    ('get', '/api/v1/auth/', 'client', None, HTTPStatus.UNAUTHORIZED, 0),
+    ('get', '/api/v1/auth/users/', 'user_client', None, HTTPStatus.OK, 2),
+    ('post', '/api/v1/auth/users/', 'client',
+     {'username': 'new_user', 'password': NEW_PASSWORD},
+     HTTPStatus.CREATED, 4),
+    ('get', '/api/v1/auth/users/me/', 'user_client', None,
+     HTTPStatus.OK, 1),
+    ('get', '/api/v1/auth/users/{user}/', 'user_client', None,
+     HTTPStatus.OK, 2),
+    ('post', '/api/v1/auth/users/activation/', 'client',
+     {'uid': 'MQ', 'token': 'invalid'}, HTTPStatus.BAD_REQUEST, 1),
+    ('post', '/api/v1/auth/users/resend_activation/', 'client',
+     {'email': 'nobody@example.com'}, HTTPStatus.BAD_REQUEST, 1),
+    ('post', '/api/v1/auth/users/reset_password/', 'client',
+     {'email': 'nobody@example.com'}, HTTPStatus.NO_CONTENT, 1),
+    ('post', '/api/v1/auth/users/reset_password_confirm/', 'client',
+     {'uid': 'MQ', 'token': 'invalid', 'new_password': NEW_PASSWORD},
+     HTTPStatus.BAD_REQUEST, 1),
+    ('post', '/api/v1/auth/users/reset_username/', 'client',
+     {'email': 'nobody@example.com'}, HTTPStatus.NO_CONTENT, 1),
+    ('post', '/api/v1/auth/users/reset_username_confirm/', 'client',
+     {'uid': 'MQ', 'token': 'invalid', 'new_username': 'renamed'},
+     HTTPStatus.BAD_REQUEST, 2),
+    ('post', '/api/v1/auth/users/set_password/', 'user_client',
+     {'current_password': PASSWORD, 'new_password': NEW_PASSWORD},
+     HTTPStatus.NO_CONTENT, 2),
+    ('post', '/api/v1/auth/users/set_username/', 'user_client',
+     {'current_password': PASSWORD, 'new_username': 'renamed'},
+     HTTPStatus.NO_CONTENT, 3),
+    # Пароль проверяется в пуле потоков, в тесте — на соединении теста
+    # (фикстура `inline_hash_pool`).
+    ('post', '/api/v1/jwt/create/', 'client',
+     {'username': '{username}', 'password': PASSWORD}, HTTPStatus.OK, 1),
+    ('post', '/api/v1/jwt/refresh/', 'client', {'refresh': '{refresh}'},
+     HTTPStatus.OK, 0),
+    ('post', '/api/v1/jwt/verify/', 'client', {'token': '{access}'},
+     HTTPStatus.OK, 0),
+    # В тестовых настройках подпись симметричная, открытого ключа нет.
+    ('get', '/api/v1/jwt/public-key/', 'client', None,
+     HTTPStatus.NOT_FOUND, 0),
+]
+
+# Списки, число запросов которых не должно зависеть от числа строк.
+LIST_ROUTES = [
+    ('/api/v1/posts/', 'client'),
+    ('/api/v1/posts/?expand=author,group,comments_preview', 'client'),
+    ('/api/v1/posts/?limit=10', 'client'),
+    ('/api/v1/posts/{post}/comments/', 'client'),
+    ('/api/v1/groups/', 'client'),
+    ('/api/v1/groups/trending/', 'client'),
+    ('/api/v1/follow/', 'user_client'),
+    ('/api/v1/changes/', 'staff_client'),
+    ('/api/v1/auth/users/', 'staff_client'),
+]
+
+
+def format_values(template, context):
+    if template is None:
+        return None
+    if isinstance(template, str):
+        return template.format(**context)
+    return {key: format_values(value, context)
+            for key, value in template.items()}
+
+
+def api_routes(resolver=None, prefix=''):
+    """Маршруты API без вариантов с суффиксом формата."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        route = prefix + str(pattern.pattern).lstrip('^')
+        if isinstance(pattern, URLResolver):
+            yield from api_routes(pattern, route)
+        elif route.startswith('api/') and '<format>' not in route:
+            yield route
+
+
+@pytest.fixture
+def budget_context(user, user_2, token, post, comment_1_post, group_1):
+    return {
+        'post': post.id,
+        'comment': comment_1_post.id,
+        'group': group_1.id,
+        'group_slug': group_1.slug,
+        'user': user.id,
+        'username': user.username,
+        'user_2': user_2.username,
+        'refresh': token['refresh'],
+        'access': token['access'],
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudgets:
+
+    def test_every_route_has_budget(self):
+        budgeted = {
+            resolve(re.sub(r'\{\w+\}', '1', url)).route
+            for _, url, *_ in ROUTE_BUDGETS
+        }
+        missing = set(api_routes()) - budgeted
+        assert not missing, (
+            'Добавьте в `ROUTE_BUDGETS` бюджет запросов для маршрутов: '
+            f'{sorted(missing)}.'
+        )
+
+    @pytest.mark.parametrize(
+        'method,url,client_name,data,expected_status,budget', ROUTE_BUDGETS,
+        ids=[f'{method} {url}' for method, url, *_ in ROUTE_BUDGETS],
+    )
+    def test_route_budget(self, request, budget_context, query_budget,
+                          inline_hash_pool,
+                          method, url, client_name, data, expected_status,
+                          budget):
+        client = request.getfixturevalue(client_name)
+        url = format_values(url, budget_context)
+        data = format_values(data, budget_context)
+        label = f'{method.upper()} {url}'
+        with query_budget(budget, label, exact=True):
+            response = getattr(client, method)(url, data=data)
+        assert response.status_code == expected_status, (
+            f'{label} вернул {response.status_code} вместо '
+            f'{expected_status}: бюджет посчитан не для того ответа.'
+        )
+
+    @pytest.mark.parametrize('url,client_name', LIST_ROUTES)
+    def test_list_queries_do_not_grow(self, request, budget_context,
+                                      query_budget, large_dataset_rows,
+                                      comment_2_post, follow_1, url,
+                                      client_name):
+        client = request.getfixturevalue(client_name)
+        url = format_values(url, budget_context)
+        user_id = request.getfixturevalue('user').id
+        post_id = budget_context['post']
+
+        def list_url():
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+
+        def grow():
+            insert_dataset(large_dataset_rows)
+            Comment.objects.bulk_create(
+                Comment(post_id=post_id, author_id=user.pk, text='Коммент')
+                for user in large_dataset_rows.users
+            )
+            Follow.objects.bulk_create(
+                Follow(user_id=user_id, following_id=user.pk)
+                for user in large_dataset_rows.users
+            )
+            Change.objects.bulk_create(
+                Change(model='post', object_id=post.pk,
+                       action=Change.CREATED, payload={})
+                for post in large_dataset_rows.posts[:100]
+            )
+            # Новых авторов первый запрос загрузит в кэш username,
+            # сравниваем запросы с прогретым кэшем.
+            list_url()
+
+        query_budget.assert_constant(list_url, grow, f'GET {url}')
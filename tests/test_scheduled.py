@@ -0,0 +1,138 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from posts.counters import group_posts
+from posts.models import AuthorSummary, Change, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestScheduledPosts:
+    post_url = '/api/v1/posts/'
+
+    def create(self, client, **data):
+        response = client.post(self.post_url, data={'text': 'Пост', **data})
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        return response.json()
+
+    def test_draft_is_hidden(self, client, user_client, another_post):
+        draft = self.create(user_client, status=Post.DRAFT)
+        assert [post['id'] for post in client.get(self.post_url).json()] == [
+            another_post.id
+        ], 'Проверьте, что черновики не попадают в общий список постов.'
+        response = client.get(f'{self.post_url}{draft["id"]}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что чужой черновик нельзя получить по id.'
+        )
+        response = user_client.get(self.post_url, {'status': Post.DRAFT})
+        assert [post['id'] for post in response.json()] == [draft['id']], (
+            'Проверьте, что `?status=draft` возвращает черновики автора.'
+        )
+        assert client.get(
+            self.post_url, {'status': Post.DRAFT}).json() == []
+        response = user_client.get(f'{self.post_url}{draft["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(
+            f'{self.post_url}{draft["id"]}/comments/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_scheduled_needs_future_time(self, user_client):
+        for publish_at in (None, timezone.now() - timedelta(minutes=1)):
+            data = {'text': 'Пост', 'status': Post.SCHEDULED}
+            if publish_at:
+                data['publish_at'] = publish_at.isoformat()
+            response = user_client.post(self.post_url, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что для запланированного поста нужно время '
+                'публикации в будущем.'
+            )
+
+    def test_publish_scheduled_posts(self, client, user_client, user,
+                                     group_1):
+        publish_at = timezone.now() + timedelta(minutes=5)
+        for _ in range(3):
+            post = self.create(
+                user_client, status=Post.SCHEDULED, group=group_1.id,
+                publish_at=publish_at.isoformat())
+        later = self.create(
+            user_client, status=Post.SCHEDULED,
+            publish_at=(publish_at + timedelta(days=1)).isoformat())
+        assert AuthorSummary.objects.get(user=user).posts_count == 0
+
+        Post.objects.filter(pk__lte=post['id']).update(
+            publish_at=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+        call_command('publish_scheduled_posts', batch_size=2, stdout=out)
+        assert 'published=3' in out.getvalue()
+        response = client.get(self.post_url)
+        assert len(response.json()) == 3, (
+            'Проверьте, что команда `publish_scheduled_posts` публикует '
+            'посты, время которых наступило.'
+        )
+        assert Post.objects.get(pk=later['id']).status == Post.SCHEDULED
+        assert AuthorSummary.objects.get(user=user).posts_count == 3
+        group_posts.flush()
+        group_1.refresh_from_db()
+        assert group_1.posts_count == 3, (
+            'Проверьте, что опубликованные посты учитываются в счётчике '
+            'группы.'
+        )
+        assert group_1.last_post_at == max(
+            post.pub_date for post in Post.objects.filter(group=group_1)
+        ), (
+            'Проверьте, что `last_post_at` группы равен дате последнего '
+            'поста, а не началу его часа.'
+        )
+        assert Change.objects.filter(
+            action=Change.UPDATED, object_id=post['id']).exists()
+
+    def test_created_post_sets_last_post_at(self, user_client, group_1):
+        post = self.create(user_client, group=group_1.id)
+        group_1.refresh_from_db()
+        assert group_1.last_post_at == Post.objects.get(
+            pk=post['id']).pub_date
+
+    def test_publish_draft_by_update(self, user_client, user):
+        draft = self.create(user_client, status=Post.DRAFT)
+        response = user_client.patch(
+            f'{self.post_url}{draft["id"]}/', data={'status': 'published'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['status'] == Post.PUBLISHED
+        assert AuthorSummary.objects.get(user=user).posts_count == 1
+        response = user_client.patch(
+            f'{self.post_url}{draft["id"]}/', data={'status': 'draft'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что опубликованный пост нельзя вернуть в черновики.'
+        )
+
+    def test_update_locks_post(self, user_client, monkeypatch):
+        scheduled = self.create(
+            user_client, status=Post.SCHEDULED,
+            publish_at=(timezone.now() + timedelta(hours=1)).isoformat())
+        locks = []
+        select_for_update = QuerySet.select_for_update
+
+        def spy(queryset, *args, **kwargs):
+            locks.append(connection.in_atomic_block)
+            return select_for_update(queryset, *args, **kwargs)
+
+        monkeypatch.setattr(QuerySet, 'select_for_update', spy)
+        response = user_client.patch(
+            f'{self.post_url}{scheduled["id"]}/', data={'text': 'Новый'})
+        assert response.status_code == HTTPStatus.OK
+        assert locks == [True], (
+            'Проверьте, что при обновлении пост читается с блокировкой '
+            'внутри транзакции, чтобы его не опубликовали параллельно.'
+        )
+
+    def test_deleting_draft_keeps_counters(self, user_client, user):
+        self.create(user_client)
+        draft = self.create(user_client, status=Post.DRAFT)
+        user_client.delete(f'{self.post_url}{draft["id"]}/')
+        assert AuthorSummary.objects.get(user=user).posts_count == 1
@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from api.serializers import CommentSerializer, PostSerializer
+
+
+def test_cached_fields_are_copied_per_instance():
+    first, second = PostSerializer(), PostSerializer()
+    assert first.fields['text'] is not second.fields['text'], (
+        'Проверьте, что каждый сериализатор получает свою копию полей.'
+    )
+    assert first.fields['text'].parent is first
+    first.fields.pop('text')
+    assert 'text' in PostSerializer().fields, (
+        'Проверьте, что изменение полей одного сериализатора не меняет '
+        'кэш полей класса.'
+    )
+
+
+def test_expand_does_not_leak_into_cache():
+    PostSerializer(context={'expand': ('group',), 'fields': ('id',)}).fields
+    assert set(PostSerializer().fields) == {
+        'id', 'text', 'pub_date', 'author', 'group', 'views_count',
+        'status', 'publish_at'
+    }
+
+
+def test_cached_fields_under_threads():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        field_sets = list(executor.map(
+            lambda _: tuple(CommentSerializer().fields), range(200)
+        ))
+    assert len(set(field_sets)) == 1
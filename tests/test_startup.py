@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.db import connection
+import pytest
+
+from yatube_api.warmup import warm_up
+
+# Бюджет на импорт WSGI-приложения с запасом на медленные машины CI.
+STARTUP_BUDGET_SECONDS = 2.0
+
+# Модули, которые должны загружаться только при первом запросе к ним.
+LAZY_MODULES = ('djoser.urls', 'djoser.urls.jwt', 'posts.admin',
+                'yatube_api.admin_urls', 'django_filters')
+
+STARTUP_SCRIPT = f'''
+import json, sys, time
+started = time.perf_counter()
+from yatube_api.wsgi import application
+print(json.dumps({{
+    'seconds': time.perf_counter() - started,
+    'loaded': [name for name in {LAZY_MODULES!r} if name in sys.modules],
+}}))
+'''
+
+
+def run_startup():
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    output = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT], cwd=settings.BASE_DIR,
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_wsgi_startup_budget():
+    result = min(
+        (run_startup() for _ in range(3)), key=lambda r: r['seconds']
+    )
+    assert not result['loaded'], (
+        'Проверьте, что при запуске WSGI-приложения не импортируются '
+        f'модули, нужные только отдельным URL: {result["loaded"]}.'
+    )
+    assert result['seconds'] < STARTUP_BUDGET_SECONDS, (
+        f'Импорт WSGI-приложения занял {result["seconds"]:.2f} с при '
+        f'бюджете {STARTUP_BUDGET_SECONDS} с. Найдите долгие импорты '
+        'командой `python manage.py importtime`.'
+    )
+
+
+@pytest.mark.django_db
+def test_warm_up():
+    timings = warm_up(connect=True)
+    assert set(timings) == {'urls', 'serializers', 'connections'}
+    assert connection.connection is not None
+
+
+WSGI_WARMUP_SCRIPT = f'''
+import json, sys
+from yatube_api.wsgi import application
+from django.db import connections
+print(json.dumps({{
+    'loaded': [name for name in {LAZY_MODULES!r} if name in sys.modules],
+    'connected': [c.alias for c in connections.all()
+                  if c.connection is not None],
+}}))
+'''
+
+
+def test_wsgi_warm_up_keeps_lazy_urls_and_connections():
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE,
+               DJANGO_WARMUP='1')
+    result = json.loads(subprocess.run(
+        [sys.executable, '-c', WSGI_WARMUP_SCRIPT], cwd=settings.BASE_DIR,
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout)
+    assert not result['loaded'], (
+        'Проверьте, что прогрев не импортирует URLconf, подключённые '
+        f'лениво: {result["loaded"]}.'
+    )
+    assert not result['connected'], (
+        'Проверьте, что прогрев точки входа WSGI не подключается к базе: '
+        'приложение может импортироваться до fork.'
+    )
+
+
+ASGI_WARMUP_SCRIPT = """
+import asyncio, importlib
+
+async def main():
+    importlib.import_module('yatube_api.asgi')
+
+asyncio.run(main())
+"""
+
+
+def test_asgi_warm_up_inside_event_loop():
+    env = dict(os.environ, DJANGO_WARMUP='1')
+    result = subprocess.run(
+        [sys.executable, '-c', ASGI_WARMUP_SCRIPT], cwd=settings.BASE_DIR,
+        env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, (
+        'Проверьте, что прогрев точки входа ASGI не обращается к базе '
+        f'внутри цикла событий:\n{result.stderr}'
+    )
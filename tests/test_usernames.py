@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+
+from posts.models import Comment
+from posts.usernames import UsernameCache, usernames
+
+
+class TestUsernameCache:
+
+    def test_size_is_bounded(self, settings):
+        settings.USERNAME_CACHE_MAX_SIZE = 2
+        cache = UsernameCache()
+        for pk, username in enumerate(('a', 'b', 'c'), 1):
+            cache.set(pk, username)
+        assert cache.get(1) is None, (
+            'Проверьте, что при переполнении кэша username вытесняются '
+            'старые записи.'
+        )
+        assert cache.get(3) == 'c'
+
+    def test_entry_expires(self, settings):
+        settings.USERNAME_CACHE_TTL = 0
+        cache = UsernameCache()
+        cache.set(1, 'a')
+        assert cache.get(1) is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestUsernameInvalidation:
+
+    def test_rename_and_delete(self, user):
+        assert usernames.get(user.pk) == user.username
+        user.username = 'renamed'
+        user.save()
+        assert usernames.get(user.pk) == 'renamed', (
+            'Проверьте, что переименование пользователя обновляет кэш.'
+        )
+        pk = user.pk
+        user.delete()
+        assert usernames.get(pk) is None, (
+            'Проверьте, что удаление пользователя убирает его из кэша.'
+        )
+
+    def test_list_primes_usernames_once(self, client, post,
+                                        django_user_model,
+                                        django_assert_num_queries):
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'author_{number}')
+            for number in range(20)
+        )
+        authors = django_user_model.objects.filter(
+            username__startswith='author_')
+        Comment.objects.bulk_create(
+            Comment(post=post, author_id=author.pk, text='Коммент')
+            for author in authors
+        )
+        usernames.clear()
+        url = f'/api/v1/posts/{post.id}/comments/'
+        # Комментарии и username всех авторов одним запросом.
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert {comment['author'] for comment in response.json()} == {
+            author.username for author in authors
+        }
+        with django_assert_num_queries(1):
+            client.get(url)
+
+    def test_follow_resolves_username_in_database(
+            self, user_client, user_2, django_user_model):
+        assert usernames.get(user_2.pk) == user_2.username
+        # Пользователя переименовали в другом процессе: кэш этого
+        # процесса об этом не знает.
+        django_user_model.objects.filter(pk=user_2.pk).update(
+            username='renamed')
+        assert usernames.get(user_2.pk) == user_2.username
+        response = user_client.post(
+            '/api/v1/follow/', data={'following': user_2.username})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что при подписке username ищется в базе, '
+            'а не только в кэше.'
+        )
@@ -0,0 +1,81 @@
+"""Аутентификация по JWT с кэшем проверенных токенов.
+
+Проверенный токен кэшируется по sha256 от его строки, запись живёт не
+дольше `JWT_VERIFY_CACHE_TTL` секунд и не дольше самого токена. Модуль
+не должен импортировать `rest_framework.views`: он загружается из
+`DEFAULT_AUTHENTICATION_CLASSES` при создании `APIView`.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+def token_key(raw_token):
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return hashlib.sha256(raw_token).digest()
+
+
+class TokenCache:
+    """Ограниченный LRU-кэш по хэшу токена с временем жизни записей."""
+
+    def __init__(self, ttl_setting, size_setting='JWT_CACHE_MAX_SIZE'):
+        self.ttl_setting = ttl_setting
+        self.size_setting = size_setting
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token):
+        key = token_key(raw_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, raw_token, value, token_exp=None):
+        """Кэшируем значение, но не дольше, чем живёт токен `token_exp`."""
+        ttl = getattr(settings, self.ttl_setting)
+        if not ttl:
+            return
+        expires_at = time.time() + ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        key = token_key(raw_token)
+        max_size = getattr(settings, self.size_setting)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+verified_tokens = TokenCache('JWT_VERIFY_CACHE_TTL')
+refreshed_tokens = TokenCache('JWT_REFRESH_REUSE_SECONDS')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, которая не проверяет подпись знакомого токена."""
+
+    def get_validated_token(self, raw_token):
+        token = verified_tokens.get(raw_token)
+        # В кэше может лежать и UntypedToken из /jwt/verify/.
+        if isinstance(token, tuple(api_settings.AUTH_TOKEN_CLASSES)):
+            return token
+        token = super().get_validated_token(raw_token)
+        verified_tokens.set(raw_token, token, token.payload.get('exp'))
+        return token
@@ -0,0 +1,158 @@
+"""Pub/sub событий о новых комментариях для потока SSE.
+
+Брокер выбирается настройкой `COMMENT_EVENTS_BROKER`:
+
+* `api.events.InProcessBroker` — события живут внутри процесса, подходит
+  для одного ASGI-воркера;
+* `api.events.ChangeLogBroker` — события читаются из журнала изменений
+  (`posts.Change`), поэтому комментарий, созданный в любом процессе,
+  доходит до подписчиков во всех процессах.
+
+Свой брокер должен реализовать `subscribe()`, `unsubscribe()` и
+`publish()` с теми же сигнатурами.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def comments_channel(post_id):
+    return f'post:{post_id}:comments'
+
+
+class Subscription:
+    """Подписка на канал с ограниченным буфером.
+
+    Если подписчик не успевает читать, старые события вытесняются, а их
+    число копится в `dropped`.
+    """
+
+    def __init__(self, broker, channel, buffer_size):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = 0
+
+    def put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Брокер внутри процесса.
+
+    `publish()` можно вызывать из любого потока, в том числе из
+    синхронных view: событие передаётся в цикл событий подписчика.
+    """
+
+    def __init__(self, buffer_size=None):
+        self.buffer_size = buffer_size or settings.COMMENT_EVENTS_BUFFER
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Подписываемся на канал, вызывать внутри цикла событий."""
+        subscription = Subscription(self, channel, self.buffer_size)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def has_subscribers(self):
+        with self._lock:
+            return bool(self._subscribers)
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.put, event)
+            except RuntimeError:
+                # Цикл событий подписчика уже закрыт.
+                self.unsubscribe(subscription)
+
+
+class ChangeLogBroker(InProcessBroker):
+    """Брокер для нескольких процессов поверх журнала изменений.
+
+    Каждый процесс раз в `COMMENT_EVENTS_POLL_INTERVAL` секунд одним
+    запросом по индексу первичного ключа забирает новые комментарии из
+    `posts.Change` и раздаёт их своим подписчикам. Пока подписчиков нет,
+    журнал не опрашивается.
+    """
+
+    def __init__(self, buffer_size=None, poll_interval=None):
+        super().__init__(buffer_size)
+        self.poll_interval = (
+            poll_interval or settings.COMMENT_EVENTS_POLL_INTERVAL)
+        self._poller = None
+
+    def publish(self, channel, event):
+        """События приходят из журнала, прямая публикация не нужна."""
+
+    def subscribe(self, channel):
+        subscription = super().subscribe(channel)
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(
+                self._poll())
+        return subscription
+
+    @staticmethod
+    def _last_seq():
+        from posts.models import Change
+
+        return Change.objects.order_by('-pk').values_list(
+            'pk', flat=True).first() or 0
+
+    @staticmethod
+    def _new_comments(after):
+        from posts.models import Change
+
+        return list(Change.objects.filter(
+            pk__gt=after, model='comment', action=Change.CREATED
+        ).order_by('pk').values_list('pk', 'payload'))
+
+    async def _poll(self):
+        last_seq = await sync_to_async(self._last_seq)()
+        while self.has_subscribers():
+            await asyncio.sleep(self.poll_interval)
+            changes = await sync_to_async(self._new_comments)(last_seq)
+            for seq, payload in changes:
+                last_seq = seq
+                super().publish(comments_channel(payload['post']), payload)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Брокер из настройки `COMMENT_EVENTS_BROKER`, один на процесс."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.COMMENT_EVENTS_BROKER)()
+    return _broker
@@ -0,0 +1,82 @@
+"""Повторяемые запросы на создание с заголовком `Idempotency-Key`.
+
+Ответ на первый успешный запрос с ключом хранится в кэше
+`IDEMPOTENCY_CACHE` `IDEMPOTENCY_KEY_TTL` секунд. Повтор с тем же
+ключом и телом получает сохранённый ответ без записи в базу, с другим
+телом — 422, а пока первый запрос ещё выполняется — 409. Отметка о
+выполняющемся запросе живёт `IDEMPOTENCY_LOCK_TTL` секунд, чтобы ключ
+не остался занятым, если воркер упал посреди запроса.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class IdempotentCreateMixin:
+    """Отдаёт сохранённый ответ `create` на повтор с тем же ключом."""
+
+    def get_idempotency_key(self, request):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return None
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return (
+            f'idempotency:{self.basename}:{request.user.pk}:'
+            f'{self.kwargs.get("post_id", "")}:{digest}'
+        )
+
+    def create(self, request, *args, **kwargs):
+        key = self.get_idempotency_key(request)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if len(request.headers[HEADER]) > MAX_KEY_LENGTH:
+            return Response(
+                {'detail': f'{HEADER} длиннее {MAX_KEY_LENGTH} символов.'},
+                status=status.HTTP_400_BAD_REQUEST)
+        cache = caches[settings.IDEMPOTENCY_CACHE]
+        fingerprint = request_fingerprint(request)
+        stored = cache.get(key)
+        if stored is None and not cache.add(
+                key, (fingerprint, None, None),
+                settings.IDEMPOTENCY_LOCK_TTL):
+            # Ключ успел занять параллельный запрос.
+            stored = cache.get(key)
+        if stored is not None:
+            return self.replay(stored, fingerprint)
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            cache.delete(key)
+            raise
+        if status.is_success(response.status_code):
+            cache.set(
+                key, (fingerprint, response.status_code, response.data),
+                settings.IDEMPOTENCY_KEY_TTL)
+        else:
+            cache.delete(key)
+        return response
+
+    def replay(self, stored, fingerprint):
+        stored_fingerprint, status_code, data = stored
+        if stored_fingerprint != fingerprint:
+            return Response(
+                {'detail': f'{HEADER} уже использован с другим запросом.'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        if status_code is None:
+            return Response(
+                {'detail': 'Запрос с этим ключом ещё выполняется.'},
+                status=status.HTTP_409_CONFLICT)
+        return Response(data, status=status_code,
+                        headers={'Idempotent-Replayed': 'true'})
@@ -0,0 +1,13 @@
+from django.urls import path, re_path
+
+from .tokens import (PublicKeyView, TokenRefreshView, TokenVerifyView,
+                     token_obtain_pair)
+
+# Перекрывают одноимённые URL djoser.
+urlpatterns = [
+    re_path(r'^jwt/create/?', token_obtain_pair, name='jwt-create'),
+    re_path(r'^jwt/refresh/?', TokenRefreshView.as_view(),
+            name='jwt-refresh'),
+    re_path(r'^jwt/verify/?', TokenVerifyView.as_view(), name='jwt-verify'),
+    path('jwt/public-key/', PublicKeyView.as_view(), name='jwt-public-key'),
+]
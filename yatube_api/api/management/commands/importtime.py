@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует модуль в отдельном процессе с `-X importtime` и '
+        'выводит самые долгие импорты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='yatube_api.wsgi')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument(
+            '--sort', choices=('self', 'cumulative'), default='cumulative')
+
+    def handle(self, *args, **options):
+        env = dict(
+            os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        started = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             f'import {options["module"]}'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if process.returncode:
+            raise CommandError(process.stderr.strip().splitlines()[-1])
+
+        rows = []
+        for line in process.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[12:].split('|')
+            rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+        key = 0 if options['sort'] == 'self' else 1
+        rows.sort(key=lambda row: row[key], reverse=True)
+
+        self.stdout.write(
+            f'{options["module"]}: {len(rows)} модулей, '
+            f'процесс {elapsed * 1000:.0f} мс')
+        self.stdout.write(f'{"self, мс":>10}{"всего, мс":>11}  модуль')
+        for self_us, cumulative_us, name in rows[:options['top']]:
+            self.stdout.write(
+                f'{self_us / 1000:>10.1f}{cumulative_us / 1000:>11.1f}'
+                f'  {name.strip()}')
@@ -1,49 +1,209 @@
+import copy
+import threading
+from types import MappingProxyType
+
+from django.db.models import Manager
+from django.utils import timezone
+from django.utils.encoding import smart_str
+from django.utils.functional import cached_property
 from rest_framework import serializers
+from rest_framework.fields import get_attribute
 from rest_framework.relations import SlugRelatedField
 from rest_framework.validators import UniqueTogetherValidator
 
-from posts.models import Comment, Follow, Group, Post, User
+from posts.models import Change, Comment, Follow, Group, Post, User
+from posts.usernames import usernames
+
+
+class CachedFieldsMixin:
+    """Строит поля ModelSerializer один раз на класс.
+
+    DRF при каждом создании сериализатора заново разбирает модель и
+    строит поля. Здесь результат первого `get_fields()` хранится в
+    классе как неизменяемый шаблон, а каждый экземпляр получает его
+    копию: поля привязываются к своему сериализатору и могут меняться
+    независимо. Шаблон заполняется под блокировкой.
+    """
+
+    _fields_lock = threading.Lock()
+
+    def get_fields(self):
+        cls = type(self)
+        template = cls.__dict__.get('_fields_template')
+        if template is None:
+            with self._fields_lock:
+                template = cls.__dict__.get('_fields_template')
+                if template is None:
+                    template = MappingProxyType(super().get_fields())
+                    cls._fields_template = template
+        return copy.deepcopy(dict(template))
+
+    @cached_property
+    def _readable_fields(self):
+        """Поля для чтения, чтобы не фильтровать их на каждой строке."""
+        return [
+            field for field in self.fields.values() if not field.write_only
+        ]
+
+
+class CachedUsernameField(SlugRelatedField):
+    """Пользователь как username, взятый из `posts.usernames`.
+
+    Для вывода нужен только id из внешнего ключа, поэтому автора не
+    нужно загружать JOIN-ом. При записи username всегда ищется в базе:
+    кэш мог пережить удаление или переименование пользователя в другом
+    процессе.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(slug_field='username', **kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def get_attribute(self, instance):
+        """Уже загруженного пользователя сразу кладём в кэш."""
+        owner = get_attribute(instance, self.source_attrs[:-1])
+        field = owner._meta.get_field(self.source_attrs[-1])
+        if field.is_cached(owner):
+            user = field.get_cached_value(owner)
+            if user is not None:
+                usernames.set(user.pk, user.username)
+        return super().get_attribute(instance)
+
+    def to_representation(self, value):
+        username = usernames.get(value.pk)
+        if username is None:
+            usernames.prime([value.pk])
+            username = usernames.get(value.pk)
+        return username
+
+    def to_internal_value(self, data):
+        username = str(data)
+        try:
+            pk = self.get_queryset().values_list('pk', flat=True).get(
+                username=username)
+        except User.DoesNotExist:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        usernames.set(pk, username)
+        # Для проверок и записи внешнего ключа хватает id.
+        return User(pk=pk, username=username)
+
+
+class UsernameListSerializer(serializers.ListSerializer):
+    """Список, которому username всех авторов нужны одним запросом."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, Manager) else data)
+        fields = [
+            field for field in self.child._readable_fields
+            if isinstance(field, CachedUsernameField)
+        ]
+        pks = set()
+        for item in items:
+            for field in fields:
+                value = field.get_attribute(item)
+                if value is not None and value.pk is not None:
+                    pks.add(value.pk)
+        usernames.prime(pks)
+        return super().to_representation(items)
+
+
+class AuthorSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    class Meta:
+        fields = ('id', 'username', 'first_name', 'last_name')
+        model = User
 
 
-class PostSerializer(serializers.ModelSerializer):
-    author = SlugRelatedField(slug_field='username', read_only=True)
+class PostSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    """Сериализатор поста.
+
+    Поля ответа можно сократить списком `fields` из контекста, а автора,
+    группу и превью комментариев — встроить списком `expand`.
+    """
+    author = CachedUsernameField(read_only=True)
 
     class Meta:
         model = Post
-        fields = ('id', 'text', 'pub_date', 'author', 'group')
+        fields = ('id', 'text', 'pub_date', 'author', 'group', 'views_count',
+                  'status', 'publish_at')
+        list_serializer_class = UsernameListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = self.context.get('expand', ())
+        if 'author' in expand:
+            self.fields['author'] = AuthorSerializer(read_only=True)
+        if 'group' in expand:
+            self.fields['group'] = GroupSerializer(read_only=True)
+        if 'comments_preview' in expand:
+            self.fields['comments_preview'] = CommentSerializer(
+                many=True, read_only=True)
+        fields = self.context.get('fields')
+        if fields:
+            for name in set(self.fields) - set(fields) - set(expand):
+                self.fields.pop(name)
 
+    def validate(self, attrs):
+        """Запланированному посту нужно время публикации в будущем."""
+        status = attrs.get(
+            'status', getattr(self.instance, 'status', Post.PUBLISHED))
+        publish_at = attrs.get(
+            'publish_at', getattr(self.instance, 'publish_at', None))
+        published = getattr(self.instance, 'status', None) == Post.PUBLISHED
+        if published and status != Post.PUBLISHED:
+            raise serializers.ValidationError(
+                {'status': 'Опубликованный пост нельзя снять с публикации.'})
+        if status == Post.SCHEDULED and (
+                publish_at is None or publish_at <= timezone.now()):
+            raise serializers.ValidationError(
+                {'publish_at': 'Укажите время публикации в будущем.'})
+        return attrs
 
-class GroupSerializer(serializers.ModelSerializer):
+
+class GroupSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     class Meta:
         fields = '__all__'
         model = Group
 
 
-class CommentSerializer(serializers.ModelSerializer):
-    post = serializers.ReadOnlyField(source='post.id')
-    author = serializers.SlugRelatedField(
-        read_only=True, slug_field='username'
-    )
+class GroupStatsSerializer(serializers.Serializer):
+    slug = serializers.SlugField()
+    title = serializers.CharField()
+    posts_count = serializers.IntegerField()
+    last_post_at = serializers.DateTimeField()
+    posts_last_day = serializers.IntegerField()
+    posts_last_week = serializers.IntegerField()
+
+
+class TrendingGroupSerializer(serializers.Serializer):
+    slug = serializers.SlugField(source='group__slug')
+    title = serializers.CharField(source='group__title')
+    recent_posts = serializers.IntegerField()
+
+
+class CommentSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    post = serializers.ReadOnlyField(source='post_id')
+    author = CachedUsernameField(read_only=True)
 
     class Meta:
         fields = '__all__'
         model = Comment
+        list_serializer_class = UsernameListSerializer
 
 
-class FollowSerializer(serializers.ModelSerializer):
-    user = serializers.SlugRelatedField(
-        slug_field='username',
+class FollowSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    user = CachedUsernameField(
         read_only=True,
         default=serializers.CurrentUserDefault()
     )
-    following = serializers.SlugRelatedField(
-        slug_field='username',
-        queryset=User.objects.all()
-    )
+    following = CachedUsernameField(queryset=User.objects.all())
 
     class Meta:
         fields = ('user', 'following')
         model = Follow
+        list_serializer_class = UsernameListSerializer
         validators = [
             UniqueTogetherValidator(
                 queryset=Follow.objects.all(),
@@ -56,3 +216,30 @@ class FollowSerializer(serializers.ModelSerializer):
         if self.context['request'].user != following:
             return following
         raise serializers.ValidationError("Нельзя подписаться на самого себя")
+
+
+class AuthorProfileSerializer(CachedFieldsMixin,
+                              serializers.ModelSerializer):
+    posts_count = serializers.IntegerField(
+        source='author_summary.posts_count', read_only=True)
+    comments_count = serializers.IntegerField(
+        source='author_summary.comments_count', read_only=True)
+    followers_count = serializers.IntegerField(
+        source='author_summary.followers_count', read_only=True)
+    following_count = serializers.IntegerField(
+        source='author_summary.following_count', read_only=True)
+    latest_posts = PostSerializer(many=True, read_only=True)
+
+    class Meta:
+        fields = ('username', 'first_name', 'last_name', 'posts_count',
+                  'comments_count', 'followers_count', 'following_count',
+                  'latest_posts')
+        model = User
+
+
+class ChangeSerializer(CachedFieldsMixin, serializers.ModelSerializer):
+    seq = serializers.IntegerField(source='pk', read_only=True)
+
+    class Meta:
+        fields = ('seq', 'model', 'object_id', 'action', 'payload', 'created')
+        model = Change
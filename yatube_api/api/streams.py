@@ -0,0 +1,135 @@
+"""Поток Server-Sent Events с новыми комментариями к посту.
+
+`GET /api/v1/posts/{post_id}/comments/stream/` обслуживается напрямую
+ASGI-приложением (см. `yatube_api/asgi.py`), остальные запросы уходят в
+Django. Каждое событие — комментарий в формате `CommentSerializer`, `id`
+события равен `id` комментария. При переподключении с заголовком
+`Last-Event-ID` сначала отдаются пропущенные комментарии из базы.
+"""
+import asyncio
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .events import comments_channel, get_broker
+
+STREAM_PATH = re.compile(r'^/api/v1/posts/(?P<post_id>\d+)/comments/stream/$')
+
+
+def format_event(comment):
+    data = json.dumps(comment, ensure_ascii=False)
+    return f'id: {comment["id"]}\nevent: comment\ndata: {data}\n\n'.encode()
+
+
+def load_post_comments(post_id, after):
+    """Есть ли пост и его комментарии с id больше `after`."""
+    from posts.models import Comment, Post
+
+    from .serializers import CommentSerializer
+
+    if not Post.objects.published().filter(pk=post_id).exists():
+        return False, []
+    if after is None:
+        return True, []
+    comments = Comment.objects.filter(
+        post_id=post_id, pk__gt=after).select_related('author').order_by('pk')
+    return True, CommentSerializer(comments, many=True).data
+
+
+def get_last_event_id(scope):
+    for name, value in scope['headers']:
+        if name == b'last-event-id' and value.isdigit():
+            return int(value)
+    return None
+
+
+class CommentStreamApplication:
+    """ASGI-обёртка, которая отдаёт поток комментариев сама."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            match = STREAM_PATH.match(scope['path'])
+            if match:
+                await self.stream(
+                    int(match['post_id']), scope, receive, send)
+                return
+        await self.application(scope, receive, send)
+
+    async def stream(self, post_id, scope, receive, send):
+        broker = get_broker()
+        # Подписываемся до чтения базы, чтобы не потерять комментарии,
+        # созданные между выборкой и подпиской.
+        subscription = broker.subscribe(comments_channel(post_id))
+        try:
+            last_id = get_last_event_id(scope)
+            exists, missed = await sync_to_async(load_post_comments)(
+                post_id, last_id)
+            if not exists:
+                await send_not_found(send)
+                return
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream; charset=utf-8'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            for comment in missed:
+                await send_body(send, format_event(comment))
+                last_id = comment['id']
+            await self.relay(subscription, last_id, receive, send)
+        finally:
+            subscription.close()
+
+    async def relay(self, subscription, last_id, receive, send):
+        """Пересылаем события, пока клиент не отключится."""
+        disconnect = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            while True:
+                event = asyncio.ensure_future(subscription.get())
+                done, _ = await asyncio.wait(
+                    (event, disconnect),
+                    timeout=settings.COMMENT_EVENTS_HEARTBEAT,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnect in done:
+                    event.cancel()
+                    return
+                if event not in done:
+                    event.cancel()
+                    await send_body(send, b': ping\n\n')
+                    continue
+                comment = event.result()
+                if last_id is None or comment['id'] > last_id:
+                    last_id = comment['id']
+                    await send_body(send, format_event(comment))
+        finally:
+            disconnect.cancel()
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def send_body(send, body):
+    await send({'type': 'http.response.body', 'body': body,
+                'more_body': True})
+
+
+async def send_not_found(send):
+    body = json.dumps({'detail': 'Страница не найдена.'},
+                      ensure_ascii=False).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': 404,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': body})
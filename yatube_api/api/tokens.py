@@ -0,0 +1,132 @@
+"""Представления JWT с кэшем проверки и обновления токенов.
+
+Мобильные клиенты часто проверяют и обновляют один и тот же токен.
+`/jwt/verify/` берёт проверенные токены из того же кэша, что и
+аутентификация. Повторное обновление того же refresh-токена в течение
+`JWT_REFRESH_REUSE_SECONDS` секунд возвращает уже выданный ответ без новой
+подписи, а частота обновлений ограничена троттлингом `jwt_refresh`.
+
+`/jwt/create/` проверяет пароль в ограниченном пуле потоков
+(`PASSWORD_HASH_WORKERS`): под ASGI синхронные view выполняются в одном
+общем потоке, и хэширование пароля задерживало бы все остальные запросы.
+Процессорное время входа отдаётся в заголовке `Server-Timing` и пишется
+в лог.
+"""
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+from rest_framework_simplejwt import serializers, views
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, UntypedToken
+
+from .authentication import refreshed_tokens, verified_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVerifySerializer(serializers.TokenVerifySerializer):
+
+    def validate(self, attrs):
+        raw_token = attrs['token']
+        if verified_tokens.get(raw_token) is None:
+            token = UntypedToken(raw_token)
+            verified_tokens.set(raw_token, token, token.payload.get('exp'))
+        return {}
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+
+    def validate(self, attrs):
+        # При ротации каждый ответ должен содержать новый refresh-токен.
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            return super().validate(attrs)
+        raw_token = attrs['refresh']
+        data = refreshed_tokens.get(raw_token)
+        if data is None:
+            refresh = RefreshToken(raw_token)
+            data = {'access': str(refresh.access_token)}
+            refreshed_tokens.set(raw_token, data, refresh.payload.get('exp'))
+        return data
+
+
+class TokenVerifyView(views.TokenVerifyView):
+    serializer_class = TokenVerifySerializer
+
+
+class TokenRefreshView(views.TokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'jwt_refresh'
+
+
+class PublicKeyView(APIView):
+    """Открытый ключ для проверки токенов без обращения к API.
+
+    Доступен, только если включена асимметричная подпись RS256.
+    """
+    permission_classes = ()
+    authentication_classes = ()
+
+    def get(self, request):
+        jwt_settings = settings.SIMPLE_JWT
+        if not jwt_settings.get('VERIFYING_KEY'):
+            raise Http404
+        return Response({
+            'algorithm': jwt_settings['ALGORITHM'],
+            'public_key': jwt_settings['VERIFYING_KEY'],
+        })
+
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+def get_hash_pool():
+    """Пул потоков для проверки паролей, один на процесс."""
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix='password-hash',
+                )
+    return _hash_pool
+
+
+_token_obtain_pair = views.TokenObtainPairView.as_view()
+
+
+def timed_token_obtain_pair(request, *args, **kwargs):
+    """Выдаём токены и замеряем процессорное время потока."""
+    close_old_connections()
+    started = time.thread_time()
+    try:
+        response = _token_obtain_pair(request, *args, **kwargs)
+    finally:
+        close_old_connections()
+    cpu_ms = (time.thread_time() - started) * 1000
+    response['Server-Timing'] = f'login-cpu;dur={cpu_ms:.1f}'
+    logger.info('Вход за %.1f мс процессорного времени, статус %s',
+                cpu_ms, response.status_code)
+    return response
+
+
+async def token_obtain_pair(request, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_pool(), functools.partial(
+        timed_token_obtain_pair, request, *args, **kwargs))
+
+
+# csrf_exempt из Django 3.2 превратил бы view в синхронную.
+token_obtain_pair.csrf_exempt = True
@@ -1,7 +1,8 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import include, path
 
-from .views import PostViewSet, CommentViewSet, GroupViewSet, FollowViewSet
+from .views import (AuthorViewSet, ChangeViewSet, CommentViewSet,
+                    FollowViewSet, GroupViewSet, PostViewSet)
 
 router = DefaultRouter()
 router.register('posts', PostViewSet, basename='posts')
@@ -10,10 +11,14 @@ router.register(
     CommentViewSet, basename='comments'
 )
 router.register('groups', GroupViewSet, basename='groups')
+router.register('authors', AuthorViewSet, basename='authors')
 router.register('follow', FollowViewSet, basename='follow')
+router.register('changes', ChangeViewSet, basename='changes')
 
+# URL djoser импортируются лениво, при первом запросе к ним.
 urlpatterns = [
     path('v1/', include(router.urls)),
-    path('v1/auth/', include('djoser.urls')),
-    path('v1/', include('djoser.urls.jwt')),
+    path('v1/auth/', ('djoser.urls', None, None)),
+    path('v1/', ('api.jwt_urls', None, None)),
+    path('v1/', ('djoser.urls.jwt', None, None)),
 ]
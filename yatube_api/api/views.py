@@ -1,14 +1,29 @@
+from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Q, Subquery
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework import filters, mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import LimitOffsetPagination
-from rest_framework.permissions import (IsAuthenticated,
+from rest_framework.permissions import (SAFE_METHODS, IsAdminUser,
+                                        IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
+from rest_framework.response import Response
 
-from posts.models import Group, Post
+from posts.counters import group_posts, post_views
+from posts.models import Change, Comment, Group, Post, User
+from posts.publishing import publish, record_published
+from posts.rollups import (get_author_summary, group_stats, record_author,
+                           record_group_post, trending_groups)
 
+from .events import comments_channel, get_broker
+from .idempotency import IdempotentCreateMixin
 from .permissions import IsAuthorOrReadOnlyPermission
-from .serializers import (CommentSerializer, FollowSerializer, GroupSerializer,
-                          PostSerializer)
+from .serializers import (AuthorProfileSerializer, ChangeSerializer,
+                          CommentSerializer, FollowSerializer, GroupSerializer,
+                          GroupStatsSerializer, PostSerializer,
+                          TrendingGroupSerializer)
 
 
 class CreateListViewSet(mixins.CreateModelMixin,
@@ -19,17 +34,213 @@ class CreateListViewSet(mixins.CreateModelMixin,
     """
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    """Viewset для модели Post."""
+def get_int_param(request, name, default):
+    value = request.query_params.get(name, default)
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        raise ValidationError({name: 'Ожидается целое число.'})
+
+
+def latest_comments(size):
+    """Queryset последних `size` комментариев каждого поста.
+
+    Лимит на пост задаётся коррелированным подзапросом, поэтому
+    prefetch одним запросом забирает превью для всей страницы постов.
+    """
+    latest_ids = Comment.objects.filter(
+        post_id=OuterRef('post_id')).order_by('-created').values('pk')[:size]
+    return Comment.objects.filter(
+        pk__in=Subquery(latest_ids)
+    ).select_related('author').order_by('-created')
+
+
+class PostViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
+    """Viewset для модели Post.
+
+    GET-запросы поддерживают `?fields=` для сокращения ответа и
+    `?expand=` для встраивания связанных объектов, а список — `?ids=`
+    для получения нескольких постов одним запросом. Список показывает
+    только опубликованные посты, а `?status=draft|scheduled` — свои
+    черновики и запланированные посты.
+    """
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAuthorOrReadOnlyPermission)
     pagination_class = LimitOffsetPagination
+    # Колонки, которые нужны каждому полю ответа при `?fields=`.
+    field_columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+        'author': ('author',),
+        'group': ('group',),
+        'views_count': ('views_count',),
+        'status': ('status',),
+        'publish_at': ('publish_at',),
+    }
+    expand_columns = {
+        'author': ('author__username', 'author__first_name',
+                   'author__last_name'),
+        'group': ('group__title', 'group__slug', 'group__description'),
+        'comments_preview': (),
+    }
+    comments_preview_size = 3
+    max_batch_size = 100
+
+    def get_query_list(self, param, allowed):
+        """Разбираем список через запятую из query-параметра."""
+        if self.request.method not in SAFE_METHODS:
+            return ()
+        values = tuple(
+            value.strip()
+            for value in self.request.query_params.get(param, '').split(',')
+            if value.strip()
+        )
+        unknown = set(values) - set(allowed)
+        if unknown:
+            raise ValidationError(
+                {param: f'Неизвестные значения: {", ".join(sorted(unknown))}'}
+            )
+        return values
+
+    def get_requested_fields(self):
+        return self.get_query_list('fields', self.field_columns)
+
+    def get_requested_expand(self):
+        return self.get_query_list('expand', self.expand_columns)
 
+    def get_queryset(self):
+        """Выбираем только нужные колонки и связи одним запросом.
+
+        Для username автора хватает `author_id`: сам username берётся из
+        кэша `posts.usernames`, автор присоединяется только при `expand`.
+        """
+        fields = self.get_requested_fields()
+        expand = self.get_requested_expand()
+        shown = set(fields or self.field_columns) | set(expand)
+        queryset = self.filter_visible(Post.objects.select_related(*(
+            name for name in ('author', 'group') if name in expand)))
+        if self.action in ('update', 'partial_update'):
+            queryset = queryset.select_for_update()
+        if 'comments_preview' in expand:
+            queryset = queryset.prefetch_related(Prefetch(
+                'comments',
+                queryset=latest_comments(self.comments_preview_size),
+                to_attr='comments_preview'
+            ))
+        if fields:
+            columns = {'id'}
+            for name in shown:
+                columns.update(self.field_columns.get(name, ()))
+            for name in expand:
+                columns.update(self.expand_columns[name])
+            queryset = queryset.only(*columns)
+        return queryset
+
+    def filter_visible(self, queryset):
+        """Чужие неопубликованные посты не видны никому."""
+        user = self.request.user
+        if self.action != 'list':
+            return queryset.filter(
+                Q(status=Post.PUBLISHED) | Q(author_id=user.pk))
+        status = self.request.query_params.get('status', Post.PUBLISHED)
+        if status == Post.PUBLISHED:
+            return queryset.published()
+        if status not in (Post.DRAFT, Post.SCHEDULED):
+            raise ValidationError({'status': 'Неизвестный статус.'})
+        return queryset.filter(status=status, author_id=user.pk)
+
+    def get_requested_ids(self):
+        """Разбираем `?ids=`, сохраняя порядок и убирая повторы."""
+        raw_ids = [
+            value.strip()
+            for value in self.request.query_params['ids'].split(',')
+            if value.strip()
+        ]
+        if not all(value.isascii() and value.isdigit() for value in raw_ids):
+            raise ValidationError({'ids': 'Ожидается список целых чисел.'})
+        ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        if len(ids) > self.max_batch_size:
+            raise ValidationError(
+                {'ids': f'Не больше {self.max_batch_size} id за запрос.'})
+        return ids
+
+    def list(self, request, *args, **kwargs):
+        """Отдаём посты по списку id одним IN-запросом.
+
+        Порядок ответа совпадает с порядком id в запросе, а id
+        ненайденных постов перечисляются в `missing`.
+        """
+        if 'ids' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        ids = self.get_requested_ids()
+        posts = self.filter_queryset(self.get_queryset()).in_bulk(ids)
+        serializer = self.get_serializer(
+            [posts[pk] for pk in ids if pk in posts], many=True)
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in posts],
+        })
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        context['expand'] = self.get_requested_expand()
+        return context
+
+    def retrieve(self, request, *args, **kwargs):
+        """Учитываем просмотр поста без записи в базу на каждый запрос."""
+        response = super().retrieve(request, *args, **kwargs)
+        post_views.increment(int(self.kwargs['pk']))
+        return response
+
+    @transaction.atomic
     def perform_create(self, serializer):
         """Переопределяем сохранение автора."""
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        Change.record(post, Change.CREATED, serializer.data)
+        if post.status == Post.PUBLISHED:
+            record_published([post])
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        """Пост читается с блокировкой до конца обновления.
+
+        Иначе `publish_scheduled_posts` мог бы опубликовать его между
+        чтением и сохранением: сохранение вернуло бы старый статус, а
+        пост попал бы в счётчики второй раз.
+        """
+        return super().update(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        """Черновик, которому поставили статус `published`, публикуем."""
+        old_group_id = serializer.instance.group_id
+        was_published = serializer.instance.status == Post.PUBLISHED
+        post = serializer.save()
+        if not was_published and post.status == Post.PUBLISHED:
+            publish([post])
+        Change.record(post, Change.UPDATED, serializer.data)
+        if was_published and post.group_id != old_group_id:
+            if old_group_id:
+                group_posts.increment(old_group_id, -1)
+                record_group_post(old_group_id, post.pub_date, -1)
+            if post.group_id:
+                group_posts.increment(post.group_id)
+                record_group_post(post.group_id, post.pub_date)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Удаляем пост мягко, комментарии вычищает фоновая задача."""
+        instance.soft_delete()
+        Change.record(instance, Change.DELETED)
+        if instance.status != Post.PUBLISHED:
+            return
+        record_author(instance.author_id, posts_count=-1)
+        if instance.group_id:
+            group_posts.increment(instance.group_id, -1)
+            record_group_post(instance.group_id, instance.pub_date, -1)
 
 
 class GroupViewSet(viewsets.ReadOnlyModelViewSet):
@@ -37,27 +248,112 @@ class GroupViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    max_trending_hours = 7 * 24
+    max_trending_limit = 50
 
+    @action(detail=False, url_path=r'(?P<slug>[-\w]+)/stats')
+    def stats(self, request, slug):
+        """Статистика группы из почасовых агрегатов."""
+        group = get_object_or_404(Group, slug=slug)
+        return Response(GroupStatsSerializer(group_stats(group)).data)
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @action(detail=False)
+    def trending(self, request):
+        """Группы с наибольшим числом постов за `?hours=` часов."""
+        hours = min(get_int_param(request, 'hours', 24) or 1,
+                    self.max_trending_hours)
+        limit = min(get_int_param(request, 'limit', 10),
+                    self.max_trending_limit)
+        groups = trending_groups(hours, limit)
+        return Response(TrendingGroupSerializer(groups, many=True).data)
+
+
+class CommentViewSet(IdempotentCreateMixin, viewsets.ModelViewSet):
     """Viewset для модели Comment."""
     serializer_class = CommentSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly, IsAuthorOrReadOnlyPermission)
 
+    def get_post_id(self):
+        return int(self.kwargs['post_id'])
+
+    def check_post_exists(self):
+        """Проверяем существование поста не чаще одного раза за запрос."""
+        if not hasattr(self, '_post_exists'):
+            self._post_exists = Post.objects.published().filter(
+                pk=self.get_post_id()).exists()
+        if not self._post_exists:
+            raise Http404
+
     def get_queryset(self):
-        """Получаем queryset комментов к посту с нужным id."""
-        post = get_object_or_404(Post, pk=self.kwargs.get('post_id'))
-        new_queryset = post.comments.all()
-        return new_queryset
+        """Получаем queryset комментов к посту с нужным id.
+
+        Сам пост не загружаем: комментарии фильтруются по `post_id`
+        с проверкой, что пост не удалён, а username авторов берутся из
+        кэша `posts.usernames`.
+        """
+        return Comment.objects.filter(
+            post_id=self.get_post_id(), post__deleted_at__isnull=True,
+            post__status=Post.PUBLISHED)
+
+    def list(self, request, *args, **kwargs):
+        """Проверяем пост отдельным запросом, только если список пуст."""
+        comments = list(self.filter_queryset(self.get_queryset()))
+        if not comments:
+            self.check_post_exists()
+        serializer = self.get_serializer(comments, many=True)
+        return Response(serializer.data)
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """Переопределяем сохранение автора и id поста."""
-        post_id = get_object_or_404(Post, pk=self.kwargs.get('post_id'))
-        serializer.save(author=self.request.user, post=post_id)
+        self.check_post_exists()
+        comment = serializer.save(
+            author=self.request.user, post_id=self.get_post_id())
+        Change.record(comment, Change.CREATED, serializer.data)
+        record_author(comment.author_id, comments_count=1)
+        data = serializer.data
+        transaction.on_commit(lambda: get_broker().publish(
+            comments_channel(comment.post_id), data))
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        comment = serializer.save()
+        Change.record(comment, Change.UPDATED, serializer.data)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        Change.record(instance, Change.DELETED)
+        record_author(instance.author_id, comments_count=-1)
+        instance.delete()
 
 
-class FollowViewSet(CreateListViewSet):
+class AuthorViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Профиль автора: счётчики из сводки и последние посты.
+
+    Пользователь и сводка читаются одним запросом по username, посты —
+    вторым, по индексу (author, -pub_date).
+    """
+    queryset = User.objects.select_related('summary')
+    serializer_class = AuthorProfileSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    lookup_field = 'username'
+    lookup_value_regex = r'[\w.@+-]+'
+    latest_posts_size = 5
+
+    def get_object(self):
+        user = super().get_object()
+        user.author_summary = get_author_summary(user)
+        user.latest_posts = list(
+            Post.objects.published().filter(author=user)
+            .order_by('-pub_date')[:self.latest_posts_size]
+        )
+        for post in user.latest_posts:
+            post.author = user
+        return user
+
+
+class FollowViewSet(IdempotentCreateMixin, CreateListViewSet):
     """Viewset для модели Follow."""
     serializer_class = FollowSerializer
     permission_classes = [IsAuthenticated]
@@ -69,5 +365,34 @@ class FollowViewSet(CreateListViewSet):
         user = self.request.user
         return user.follower.all()
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        follow = serializer.save(user=self.request.user)
+        Change.record(follow, Change.CREATED, serializer.data)
+        record_author(follow.user_id, following_count=1)
+        record_author(follow.following_id, followers_count=1)
+
+
+class ChangeViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Журнал изменений для внешних систем.
+
+    `?after=<seq>` отдаёт записи с `seq` больше указанного по
+    возрастанию, не больше `?limit=`. В `next_after` — значение для
+    следующего запроса.
+    """
+    queryset = Change.objects.order_by('pk')
+    serializer_class = ChangeSerializer
+    permission_classes = [IsAdminUser]
+    default_limit = 100
+    max_limit = 1000
+
+    def list(self, request, *args, **kwargs):
+        after = get_int_param(request, 'after', 0)
+        limit = min(
+            get_int_param(request, 'limit', self.default_limit),
+            self.max_limit)
+        changes = list(self.get_queryset().filter(pk__gt=after)[:limit])
+        return Response({
+            'results': self.get_serializer(changes, many=True).data,
+            'next_after': changes[-1].pk if changes else after,
+        })
@@ -1,16 +1,122 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
 
-from .models import Comment, Follow, Group, Post
+from .models import Comment, Follow, Group, Post, User
+from .purge import purge_user
+
+# До этого числа строк точный COUNT(*) дешевле, чем ошибка оценки.
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def estimate_count(queryset):
+    """Оцениваем число строк таблицы без полного COUNT(*).
+
+    В PostgreSQL берём статистику планировщика, в остальных базах —
+    максимальный id, который читается по индексу первичного ключа.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+    return model._base_manager.using(queryset.db).aggregate(
+        max_pk=Max('pk'))['max_pk'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который для больших таблиц не считает строки точно."""
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate < EXACT_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
-    search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_select_related = ('author', 'group')
+    # Поиск только по точному username автора или slug группы, см.
+    # `get_search_results`: icontains по `text` сканирует всю таблицу.
+    search_fields = ('author__username', 'group__slug')
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'group')
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Находим id автора и группы по уникальным индексам.
+
+        Посты затем фильтруются по `author_id` и `group_id` без JOIN и
+        без сравнения без учёта регистра, которое индекс не использует.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition = Q()
+        author_id = User.objects.filter(
+            username=search_term).values_list('pk', flat=True).first()
+        if author_id is not None:
+            condition |= Q(author_id=author_id)
+        group_id = Group.objects.filter(
+            slug=search_term).values_list('pk', flat=True).first()
+        if group_id is not None:
+            condition |= Q(group_id=group_id)
+        if not condition:
+            return queryset.none(), False
+        return queryset.filter(condition), False
+
+    def get_paginator(self, request, queryset, per_page,
+                      orphans=0, allow_empty_first_page=True):
+        """Оцениваем число постов, только если список не отфильтрован."""
+        paginator_class = self.paginator
+        if not set(request.GET) - {PAGE_VAR, ORDER_VAR}:
+            paginator_class = EstimatedCountPaginator
+        return paginator_class(
+            queryset, per_page, orphans, allow_empty_first_page)
+
+
+class UserAdmin(BaseUserAdmin):
+    actions = ('purge_selected',)
+
+    @admin.action(
+        description='Удалить выбранных пользователей порциями',
+        permissions=('delete',)
+    )
+    def purge_selected(self, request, queryset):
+        """Удаляем пользователей через `purge_user` вместо коллектора."""
+        for user in queryset:
+            username = user.username
+            for progress in purge_user(user):
+                pass
+            self.message_user(
+                request,
+                f'{username}: удалено строк {progress.deleted} '
+                f'за {progress.elapsed:.1f} с '
+                f'({progress.rate:.0f} строк/с).',
+                messages.SUCCESS
+            )
+
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment)
 admin.site.register(Follow)
+admin.site.unregister(User)
+admin.site.register(User, UserAdmin)
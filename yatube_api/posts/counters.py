@@ -0,0 +1,138 @@
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Group, Post
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindCounter:
+    """Счётчик, который копит приращения в памяти и пишет их пачками.
+
+    `increment()` только меняет словарь в памяти, причём внутри
+    транзакции — после её фиксации, чтобы откат не оставлял приращений.
+    Накопленное записывается в базу одним UPDATE с CASE по id: в фоновом
+    потоке раз в `COUNTERS_FLUSH_INTERVAL` секунд, досрочно при
+    `COUNTERS_MAX_KEYS` разных ключах и при завершении процесса. Если
+    интервал не задан, фоновый поток не запускается: при переполнении
+    `increment()` пишет сам, а в остальное время сбрасывать нужно вызовом
+    `flush()`. Ошибки записи `increment()` только логирует, а после
+    неудачного сброса в памяти остаётся не больше `COUNTERS_MAX_KEYS`
+    ключей, остальные приращения теряются.
+    """
+
+    # Не больше стольких id в одном UPDATE, чтобы уложиться в лимит
+    # параметров запроса SQLite.
+    chunk_size = 400
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._worker = None
+        self._stopped = threading.Event()
+        self._wake = threading.Event()
+        atexit.register(self.stop)
+
+    def increment(self, pk, amount=1):
+        transaction.on_commit(lambda: self._add(pk, amount))
+
+    def _add(self, pk, amount):
+        with self._lock:
+            self._pending[pk] += amount
+            full = len(self._pending) >= settings.COUNTERS_MAX_KEYS
+        self._ensure_worker()
+        if not full:
+            return
+        if self._worker is not None:
+            self._wake.set()
+            return
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Не удалось записать счётчик %s', self.field)
+
+    def flush(self):
+        """Записываем накопленные приращения, возвращаем число строк."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+            items = [(pk, amount) for pk, amount in pending.items() if amount]
+            updated = 0
+            for start in range(0, len(items), self.chunk_size):
+                try:
+                    updated += self._update(
+                        items[start:start + self.chunk_size])
+                except Exception:
+                    # Незаписанное вернётся в следующий flush().
+                    self._restore(items[start:])
+                    raise
+            return updated
+
+    def _restore(self, items):
+        dropped = 0
+        with self._lock:
+            for pk, amount in items:
+                if (pk in self._pending
+                        or len(self._pending) < settings.COUNTERS_MAX_KEYS):
+                    self._pending[pk] += amount
+                else:
+                    dropped += 1
+        if dropped:
+            logger.warning('Счётчик %s: отброшены приращения %s ключей',
+                           self.field, dropped)
+
+    def discard(self):
+        """Отбрасываем накопленные приращения без записи."""
+        with self._lock:
+            self._pending.clear()
+
+    def _update(self, items):
+        delta = Case(
+            *(When(pk=pk, then=Value(amount)) for pk, amount in items),
+            default=Value(0), output_field=IntegerField(),
+        )
+        # Счётчик не уходит ниже нуля, даже если вычитаний накопилось
+        # больше, чем было записано.
+        return self.model._base_manager.filter(
+            pk__in=[pk for pk, _ in items]
+        ).update(**{self.field: Greatest(F(self.field) + delta, Value(0))})
+
+    def _ensure_worker(self):
+        if not settings.COUNTERS_FLUSH_INTERVAL or self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=f'{self.field}-flush', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(settings.COUNTERS_FLUSH_INTERVAL)
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось записать счётчик %s', self.field)
+        connection.close()
+
+    def stop(self):
+        """Останавливаем фоновый поток и записываем остаток."""
+        self._stopped.set()
+        self._wake.set()
+        self.flush()
+
+
+post_views = WriteBehindCounter(Post, 'views_count')
+group_posts = WriteBehindCounter(Group, 'posts_count')
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.publishing import next_publish_at, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = 'Публикует запланированные посты, время которых наступило.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Работать постоянно, проверяя посты не реже, чем раз в '
+                 'столько секунд.'
+        )
+
+    def publish(self, batch_size):
+        published = sum(publish_due_posts(batch_size))
+        if published:
+            self.stdout.write(f'published={published}')
+
+    def handle(self, *args, **options):
+        if not options['interval']:
+            self.publish(options['batch_size'])
+            return
+        while True:
+            self.publish(options['batch_size'])
+            # Спим до ближайшей публикации, но не дольше интервала.
+            delay = options['interval']
+            upcoming = next_publish_at()
+            if upcoming is not None:
+                delay = min(
+                    delay, (upcoming - timezone.now()).total_seconds())
+            time.sleep(max(delay, 0))
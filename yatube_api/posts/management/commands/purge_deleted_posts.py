@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.purge import purge_deleted_posts
+
+
+class Command(BaseCommand):
+    help = 'Удаляет комментарии и файлы мягко удалённых постов порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Пауза между порциями в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        progress = None
+        for progress in purge_deleted_posts(options['batch_size']):
+            self.stdout.write(
+                f'posts={progress.posts} comments={progress.comments} '
+                f'files={progress.files}'
+            )
+            if options['pause']:
+                time.sleep(options['pause'])
+        if progress is None:
+            self.stdout.write('Нет постов для удаления.')
+        else:
+            self.stdout.write(self.style.SUCCESS('Готово.'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.models import User
+from posts.purge import purge_user
+
+
+class Command(BaseCommand):
+    help = 'Удаляет пользователей и их записи порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='+')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(username__in=options['usernames'])
+        missing = set(options['usernames']) - {u.username for u in users}
+        if missing:
+            raise CommandError(
+                'Пользователи не найдены: ' + ', '.join(sorted(missing)))
+        for user in users:
+            username = user.username
+            for progress in purge_user(user, options['batch_size']):
+                self.stdout.write(
+                    f'{username}: {progress.stage} '
+                    f'deleted={progress.deleted} '
+                    f'rate={progress.rate:.0f} rows/s'
+                )
+            self.stdout.write(self.style.SUCCESS(f'{username}: удалён.'))
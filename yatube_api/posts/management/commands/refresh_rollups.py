@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.rollups import refresh_author_summaries, refresh_group_activity
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает агрегаты статистики групп и профилей авторов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = refresh_group_activity()
+        self.stdout.write(f'group_activity={rows}')
+        rows = refresh_author_summaries(batch_size=options['batch_size'])
+        self.stdout.write(f'author_summary={rows}')
+        self.stdout.write(self.style.SUCCESS('Готово.'))
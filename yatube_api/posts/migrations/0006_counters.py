@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-19 15:12
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_group_posts(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.filter(
+        group=models.OuterRef('pk'), deleted_at__isnull=True
+    ).order_by().values('group').annotate(
+        count=models.Count('pk')).values('count')
+    Group.objects.update(
+        posts_count=Coalesce(models.Subquery(posts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_group_posts, migrations.RunPython.noop),
+    ]
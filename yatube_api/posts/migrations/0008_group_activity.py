@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-19 15:33
+
+from datetime import timedelta
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+
+def fill_group_activity(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupActivity = apps.get_model('posts', 'GroupActivity')
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.filter(group__isnull=False, deleted_at__isnull=True)
+    since = timezone.now() - timedelta(days=30)
+    buckets = (
+        posts.filter(pub_date__gte=since)
+        .annotate(bucket=TruncHour('pub_date')).order_by()
+        .values('group_id', 'bucket').annotate(count=models.Count('pk'))
+    )
+    GroupActivity.objects.bulk_create(
+        GroupActivity(group_id=row['group_id'], bucket=row['bucket'],
+                      posts_count=row['count'])
+        for row in buckets
+    )
+    last_posts = posts.filter(group=models.OuterRef('pk')).order_by(
+        '-pub_date').values('pub_date')[:1]
+    Group.objects.update(last_post_at=models.Subquery(last_posts))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_change'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='last_post_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Последний пост'),
+        ),
+        migrations.CreateModel(
+            name='GroupActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(verbose_name='Начало часа')),
+                ('posts_count', models.IntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='posts.group')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupactivity',
+            index=models.Index(fields=['bucket'], name='group_activity_bucket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupactivity',
+            constraint=models.UniqueConstraint(fields=('group', 'bucket'), name='group_activity_bucket'),
+        ),
+        migrations.RunPython(fill_group_activity, migrations.RunPython.noop),
+    ]
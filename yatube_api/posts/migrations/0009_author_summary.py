@@ -0,0 +1,58 @@
+# Generated by Django 3.2.16 on 2026-10-19 15:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_author_summary(apps, schema_editor):
+    AuthorSummary = apps.get_model('posts', 'AuthorSummary')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    def count_by(queryset, field):
+        return dict(queryset.order_by().values_list(field).annotate(
+            count=models.Count('pk')))
+
+    posts = count_by(Post.objects.filter(deleted_at__isnull=True),
+                     'author_id')
+    comments = count_by(Comment.objects.all(), 'author_id')
+    followers = count_by(Follow.objects.all(), 'following_id')
+    following = count_by(Follow.objects.all(), 'user_id')
+    AuthorSummary.objects.bulk_create(
+        (AuthorSummary(user_id=pk,
+                       posts_count=posts.get(pk, 0),
+                       comments_count=comments.get(pk, 0),
+                       followers_count=followers.get(pk, 0),
+                       following_count=following.get(pk, 0))
+         for pk in User.objects.values_list('pk', flat=True).iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0008_group_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.IntegerField(default=0)),
+                ('comments_count', models.IntegerField(default=0)),
+                ('followers_count', models.IntegerField(default=0)),
+                ('following_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='post_author_pub_date_idx'),
+        ),
+        migrations.RunPython(fill_author_summary, migrations.RunPython.noop),
+    ]
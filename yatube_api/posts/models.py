@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -8,14 +9,64 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    # Обновляется с задержкой через posts.counters.group_posts.
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    # Обновляется при публикации поста через posts.rollups.
+    last_post_at = models.DateTimeField(
+        'Последний пост', null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.title
 
 
+class GroupActivity(models.Model):
+    """Сколько постов опубликовано в группе за час.
+
+    Строки обновляются при создании и удалении постов (posts.rollups),
+    по ним считаются посты за последние сутки и неделю и тренды.
+    """
+    group = models.ForeignKey(
+        Group, on_delete=models.CASCADE, related_name='activity')
+    bucket = models.DateTimeField('Начало часа')
+    posts_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'bucket'],
+                                    name='group_activity_bucket')
+        ]
+        indexes = [
+            models.Index(fields=['bucket'], name='group_activity_bucket_idx')
+        ]
+
+
+class PostQuerySet(models.QuerySet):
+
+    def published(self):
+        """Опубликованные посты, без черновиков и запланированных."""
+        return self.filter(status=Post.PUBLISHED)
+
+
+class PostManager(models.Manager.from_queryset(PostQuerySet)):
+    """Менеджер, скрывающий мягко удалённые посты."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Post(models.Model):
+    DRAFT = 'draft'
+    SCHEDULED = 'scheduled'
+    PUBLISHED = 'published'
+    STATUSES = (
+        (DRAFT, 'Черновик'),
+        (SCHEDULED, 'Запланирован'),
+        (PUBLISHED, 'Опубликован'),
+    )
+
     text = models.TextField()
-    pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    pub_date = models.DateTimeField(
+        'Дата публикации', auto_now_add=True, db_index=True)
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='posts')
     image = models.ImageField(
@@ -23,10 +74,38 @@ class Post(models.Model):
     group = models.ForeignKey(
         Group, on_delete=models.SET_NULL, related_name='posts',
         blank=True, null=True)
+    deleted_at = models.DateTimeField(
+        'Дата удаления', null=True, blank=True, db_index=True)
+    # Обновляется с задержкой через posts.counters.post_views.
+    views_count = models.PositiveIntegerField(default=0, editable=False)
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PUBLISHED)
+    # Запланированные посты публикует команда publish_scheduled_posts.
+    publish_at = models.DateTimeField(
+        'Время публикации', null=True, blank=True)
+
+    objects = PostManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', '-pub_date'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['status', 'publish_at'],
+                         name='post_status_publish_at_idx'),
+        ]
 
     def __str__(self):
         return self.text
 
+    def soft_delete(self):
+        """Скрываем пост, не трогая комментарии и файлы.
+
+        Сами данные удаляет команда `purge_deleted_posts`.
+        """
+        self.deleted_at = timezone.now()
+        self.save(update_fields=('deleted_at',))
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -55,3 +134,50 @@ class Follow(models.Model):
             models.UniqueConstraint(fields=['user', 'following'],
                                     name='user_following')
         ]
+
+
+class AuthorSummary(models.Model):
+    """Счётчики профиля автора.
+
+    Меняются в транзакции, которая создаёт или удаляет пост, комментарий
+    или подписку (posts.rollups), и пересчитываются командой
+    `refresh_rollups`.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='summary')
+    posts_count = models.IntegerField(default=0)
+    comments_count = models.IntegerField(default=0)
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+
+
+class Change(models.Model):
+    """Запись журнала изменений постов, комментариев и подписок.
+
+    Пишется в той же транзакции, что и само изменение. Потребители
+    читают журнал по возрастанию `id`, запоминая последний прочитанный.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Создание'),
+        (UPDATED, 'Изменение'),
+        (DELETED, 'Удаление'),
+    )
+
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTIONS)
+    payload = models.JSONField(null=True, blank=True)
+    created = models.DateTimeField('Дата изменения', auto_now_add=True)
+
+    @classmethod
+    def record(cls, instance, action, payload=None):
+        return cls.objects.create(
+            model=instance._meta.model_name,
+            object_id=instance.pk,
+            action=action,
+            payload=payload,
+        )
@@ -0,0 +1,87 @@
+"""Публикация черновиков и запланированных постов.
+
+Пока пост не опубликован, он не попадает в счётчики групп и авторов.
+`record_published()` учитывает посты в момент публикации — сразу при
+создании или командой `publish_scheduled_posts`, которая забирает
+наступившие посты по индексу (status, publish_at) порциями.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .counters import group_posts
+from .models import Change, Post
+from .rollups import (add_group_activity, advance_last_post, bucket_start,
+                      record_author)
+
+
+def record_published(posts):
+    """Учитываем опубликованные посты в счётчиках групп и авторов."""
+    authors = Counter(post.author_id for post in posts)
+    buckets = Counter(
+        (post.group_id, bucket_start(post.pub_date))
+        for post in posts if post.group_id
+    )
+    last_posts = {}
+    for post in posts:
+        if post.group_id:
+            last_posts[post.group_id] = max(
+                post.pub_date, last_posts.get(post.group_id, post.pub_date))
+    for author_id, count in authors.items():
+        record_author(author_id, posts_count=count)
+    for (group_id, bucket), count in buckets.items():
+        group_posts.increment(group_id, count)
+        add_group_activity(group_id, bucket, count)
+    for group_id, pub_date in last_posts.items():
+        advance_last_post(group_id, pub_date)
+
+
+def publish(posts, now=None):
+    """Публикуем загруженные посты в текущей транзакции.
+
+    Дата публикации — запланированное время, если оно уже прошло, иначе
+    `now`. Запись в журнал изменений делает вызывающий код.
+    """
+    now = now or timezone.now()
+    for post in posts:
+        post.status = Post.PUBLISHED
+        post.pub_date = min(post.publish_at or now, now)
+    Post.objects.bulk_update(posts, ['status', 'pub_date'])
+    record_published(posts)
+
+
+def publish_due_posts(batch_size=500, now=None):
+    """Публикуем наступившие посты, отдаём размер каждой порции.
+
+    Порция блокируется с SKIP LOCKED там, где база это умеет, поэтому
+    несколько воркеров не опубликуют один пост дважды.
+    """
+    now = now or timezone.now()
+    while True:
+        with transaction.atomic():
+            posts = list(
+                Post.objects.select_for_update(skip_locked=True)
+                .filter(status=Post.SCHEDULED, publish_at__lte=now)
+                .order_by('publish_at')[:batch_size]
+            )
+            if not posts:
+                return
+            publish(posts, now)
+            Change.objects.bulk_create(
+                Change(model='post', object_id=post.pk,
+                       action=Change.UPDATED,
+                       payload={'status': post.status,
+                                'pub_date': post.pub_date.isoformat()})
+                for post in posts
+            )
+        yield len(posts)
+
+
+def next_publish_at():
+    """Время ближайшей запланированной публикации или None."""
+    return (
+        Post.objects.filter(status=Post.SCHEDULED)
+        .order_by('publish_at').values_list('publish_at', flat=True)
+        .first()
+    )
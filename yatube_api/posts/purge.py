@@ -0,0 +1,156 @@
+import time
+from collections import namedtuple
+
+from django.db.models import Count, signals
+from django.db.models.functions import TruncHour
+
+from .counters import group_posts
+from .models import Comment, Follow, Post
+from .rollups import (add_group_activity, record_author,
+                      refresh_author_summaries, refresh_last_post)
+
+PurgeProgress = namedtuple('PurgeProgress', ('posts', 'comments', 'files'))
+
+
+class UserPurgeProgress(
+        namedtuple('UserPurgeProgress', ('stage', 'deleted', 'elapsed'))):
+    """Прогресс удаления пользователя: этап, всего строк и время."""
+
+    @property
+    def rate(self):
+        """Строк в секунду с начала удаления."""
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+
+def needs_collector(model):
+    """Нужен ли Django-коллектор при удалении строк модели.
+
+    Коллектор нужен, если на удаление подписаны сигналы или на модель
+    ссылаются другие таблицы. Иначе хватает одного DELETE по id.
+    """
+    return (
+        signals.pre_delete.has_listeners(model)
+        or signals.post_delete.has_listeners(model)
+        or bool(model._meta.related_objects)
+    )
+
+
+def delete_in_batches(queryset, batch_size):
+    """Удаляем строки queryset порциями, отдаём размер каждой порции.
+
+    Каждая порция выбирается заново, поэтому прерванное удаление можно
+    просто запустить ещё раз.
+    """
+    model = queryset.model
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        batch = model._base_manager.filter(pk__in=ids)
+        if needs_collector(model):
+            deleted, _ = batch.delete()
+        else:
+            deleted = batch._raw_delete(batch.db)
+        yield deleted
+
+
+def delete_post_images(post_ids):
+    """Удаляем файлы картинок постов, возвращаем их количество."""
+    storage = Post._meta.get_field('image').storage
+    images = (
+        Post.all_objects.filter(pk__in=post_ids)
+        .exclude(image='').exclude(image__isnull=True)
+        .values_list('image', flat=True)
+    )
+    count = 0
+    for image in images:
+        storage.delete(image)
+        count += 1
+    return count
+
+
+def purge_deleted_posts(batch_size=500):
+    """Окончательно удаляем мягко удалённые посты порциями.
+
+    Комментарии удаляются пачками не больше `batch_size` строк, каждая
+    пачка — отдельная короткая транзакция, поэтому блокировка записи
+    SQLite не держится долго. После каждой пачки отдаём накопленный
+    прогресс в виде `PurgeProgress`.
+    """
+    posts_count = comments_count = files_count = 0
+    while True:
+        post_ids = list(
+            Post.all_objects.filter(deleted_at__isnull=False)
+            .order_by('deleted_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not post_ids:
+            return
+        comments = Comment.objects.filter(post_id__in=post_ids)
+        authors = list(comments.order_by().values_list('author_id').annotate(
+            count=Count('pk')))
+        for deleted in delete_in_batches(comments, batch_size):
+            comments_count += deleted
+            yield PurgeProgress(posts_count, comments_count, files_count)
+        for author_id, count in authors:
+            record_author(author_id, comments_count=-count)
+        files_count += delete_post_images(post_ids)
+        deleted, _ = Post.all_objects.filter(pk__in=post_ids).delete()
+        posts_count += deleted
+        yield PurgeProgress(posts_count, comments_count, files_count)
+
+
+def purge_user(user, batch_size=1000):
+    """Удаляем пользователя и все зависящие от него строки порциями.
+
+    Вместо одного огромного коллектора и одной транзакции удаляем
+    комментарии, подписки и посты пачками, а самого пользователя — в
+    конце, когда каскаду уже нечего собирать. Отдаём
+    `UserPurgeProgress` после каждой пачки.
+    """
+    started = time.monotonic()
+    deleted = 0
+    # Сводки тех, чьи комментарии и подписки удалятся вместе с
+    # пользователем, пересчитываются в конце.
+    affected = set(Comment.objects.filter(
+        post__author_id=user.pk).values_list('author_id', flat=True))
+    affected.update(Follow.objects.filter(
+        user_id=user.pk).values_list('following_id', flat=True))
+    affected.update(Follow.objects.filter(
+        following_id=user.pk).values_list('user_id', flat=True))
+    affected.discard(user.pk)
+    stages = (
+        ('comments', Comment.objects.filter(author_id=user.pk)),
+        ('post_comments', Comment.objects.filter(post__author_id=user.pk)),
+        ('follows', Follow.objects.filter(user_id=user.pk)),
+        ('followers', Follow.objects.filter(following_id=user.pk)),
+    )
+    for stage, queryset in stages:
+        for count in delete_in_batches(queryset, batch_size):
+            deleted += count
+            yield UserPurgeProgress(
+                stage, deleted, time.monotonic() - started)
+    posts = Post.all_objects.filter(author_id=user.pk)
+    while True:
+        post_ids = list(posts.values_list('pk', flat=True)[:batch_size])
+        if not post_ids:
+            break
+        buckets = list(
+            Post.objects.published()
+            .filter(pk__in=post_ids, group__isnull=False)
+            .annotate(bucket=TruncHour('pub_date')).order_by()
+            .values_list('group_id', 'bucket').annotate(count=Count('pk'))
+        )
+        for group_id, bucket, count in buckets:
+            group_posts.increment(group_id, -count)
+            add_group_activity(group_id, bucket, -count)
+        delete_post_images(post_ids)
+        count, _ = Post.all_objects.filter(pk__in=post_ids).delete()
+        # Последний пост группы считаем уже без удалённых.
+        refresh_last_post({group_id for group_id, _, _ in buckets})
+        deleted += count
+        yield UserPurgeProgress('posts', deleted, time.monotonic() - started)
+    count, _ = user.delete()
+    deleted += count
+    refresh_author_summaries(affected, batch_size)
+    yield UserPurgeProgress('user', deleted, time.monotonic() - started)
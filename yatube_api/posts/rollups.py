@@ -0,0 +1,229 @@
+"""Заранее посчитанные агрегаты для статистики групп и профилей.
+
+Почасовые строки `GroupActivity`, `Group.last_post_at` и счётчики
+`AuthorSummary` обновляются в транзакции, которая меняет исходные
+строки. Команда `refresh_rollups` пересчитывает их заново вместе с
+`Group.posts_count`, а у групп ещё и удаляет старые часы.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import (AuthorSummary, Comment, Follow, Group, GroupActivity,
+                     Post, User)
+
+BUCKET = timedelta(hours=1)
+
+
+def bucket_start(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def add_group_activity(group_id, bucket, delta):
+    """Прибавляем `delta` постов к часу `bucket` в группе."""
+    activity = GroupActivity.objects.filter(group_id=group_id, bucket=bucket)
+    updated = activity.update(posts_count=F('posts_count') + delta)
+    if not updated and delta > 0:
+        # Для отрицательной дельты строки нет, только если час уже
+        # вышел за период хранения или ещё не пересчитан командой.
+        try:
+            with transaction.atomic():
+                GroupActivity.objects.create(
+                    group_id=group_id, bucket=bucket, posts_count=delta)
+        except IntegrityError:
+            # Строку часа успел создать параллельный запрос.
+            activity.update(posts_count=F('posts_count') + delta)
+
+
+def advance_last_post(group_id, pub_date):
+    """Сдвигаем `last_post_at` группы вперёд до `pub_date`."""
+    Group.objects.filter(
+        Q(last_post_at__isnull=True) | Q(last_post_at__lt=pub_date),
+        pk=group_id,
+    ).update(last_post_at=pub_date)
+
+
+def refresh_last_post(group_ids):
+    """Пересчитываем `last_post_at` групп по их опубликованным постам.
+
+    Нужно, когда пост уходит из группы: им мог быть последний пост.
+    """
+    last_posts = (
+        Post.objects.published().filter(group=OuterRef('pk'))
+        .order_by('-pub_date').values('pub_date')[:1]
+    )
+    Group.objects.filter(pk__in=group_ids).update(
+        last_post_at=Subquery(last_posts))
+
+
+def record_group_post(group_id, pub_date, delta=1):
+    """Прибавляем `delta` постов к часу `pub_date` в группе.
+
+    Вызывается после того, как пост уже добавлен в группу или убран из
+    неё.
+    """
+    add_group_activity(group_id, bucket_start(pub_date), delta)
+    if delta > 0:
+        advance_last_post(group_id, pub_date)
+    else:
+        refresh_last_post([group_id])
+
+
+def group_stats(group, now=None):
+    """Посты за сутки и неделю из почасовых строк одним запросом."""
+    now = now or timezone.now()
+    day_ago = bucket_start(now) - timedelta(hours=23)
+    week_ago = bucket_start(now) - timedelta(days=7) + BUCKET
+    counts = GroupActivity.objects.filter(
+        group=group, bucket__gte=week_ago
+    ).aggregate(
+        posts_last_day=Sum('posts_count', filter=Q(bucket__gte=day_ago)),
+        posts_last_week=Sum('posts_count'),
+    )
+    return {
+        'slug': group.slug,
+        'title': group.title,
+        'posts_count': group.posts_count,
+        'last_post_at': group.last_post_at,
+        'posts_last_day': counts['posts_last_day'] or 0,
+        'posts_last_week': counts['posts_last_week'] or 0,
+    }
+
+
+def trending_groups(hours, limit, now=None):
+    """Группы с наибольшим числом постов за последние `hours` часов."""
+    now = now or timezone.now()
+    since = bucket_start(now) - timedelta(hours=hours - 1)
+    return list(
+        GroupActivity.objects.filter(bucket__gte=since)
+        .values('group_id')
+        .annotate(recent_posts=Sum('posts_count'))
+        .filter(recent_posts__gt=0)
+        .order_by('-recent_posts', 'group_id')
+        .values('group__slug', 'group__title', 'recent_posts')[:limit]
+    )
+
+
+def refresh_group_activity(now=None):
+    """Пересчитываем часы за `GROUP_ACTIVITY_RETENTION`, `last_post_at`
+    и `posts_count` групп.
+
+    Более старые часы удаляются: ни статистике, ни трендам они не нужны.
+    Возвращаем число записанных строк.
+    """
+    now = now or timezone.now()
+    since = bucket_start(now) - settings.GROUP_ACTIVITY_RETENTION
+    buckets = (
+        Post.objects.published()
+        .filter(group__isnull=False, pub_date__gte=since)
+        .annotate(bucket=TruncHour('pub_date'))
+        .order_by()
+        .values('group_id', 'bucket')
+        .annotate(count=Count('pk'))
+    )
+    with transaction.atomic():
+        GroupActivity.objects.all().delete()
+        GroupActivity.objects.bulk_create(
+            (GroupActivity(group_id=row['group_id'], bucket=row['bucket'],
+                           posts_count=row['count'])
+             for row in buckets),
+            batch_size=1000,
+        )
+        published = (
+            Post.objects.published().filter(group__isnull=False).order_by()
+            .values_list('group_id')
+        )
+        last_posts = dict(published.annotate(last=Max('pub_date')))
+        posts_counts = dict(published.annotate(count=Count('pk')))
+        groups = list(
+            Group.objects.only('pk', 'last_post_at', 'posts_count'))
+        for group in groups:
+            group.last_post_at = last_posts.get(group.pk)
+            group.posts_count = posts_counts.get(group.pk, 0)
+        Group.objects.bulk_update(
+            groups, ['last_post_at', 'posts_count'], batch_size=1000)
+    return GroupActivity.objects.count()
+
+
+def count_by(queryset, field, ids):
+    return dict(
+        queryset.filter(**{f'{field}__in': ids}).order_by()
+        .values_list(field).annotate(count=Count('pk'))
+    )
+
+
+def build_author_summaries(user_ids):
+    """Счётчики авторов из исходных таблиц, по запросу на счётчик."""
+    posts = count_by(Post.objects.published(), 'author_id', user_ids)
+    comments = count_by(Comment.objects, 'author_id', user_ids)
+    followers = count_by(Follow.objects, 'following_id', user_ids)
+    following = count_by(Follow.objects, 'user_id', user_ids)
+    return [
+        AuthorSummary(
+            user_id=pk,
+            posts_count=posts.get(pk, 0),
+            comments_count=comments.get(pk, 0),
+            followers_count=followers.get(pk, 0),
+            following_count=following.get(pk, 0),
+        )
+        for pk in user_ids
+    ]
+
+
+def create_author_summary(user_id):
+    """Создаём посчитанную с нуля сводку, если её ещё нет."""
+    try:
+        with transaction.atomic():
+            build_author_summaries([user_id])[0].save(force_insert=True)
+    except IntegrityError:
+        # Сводку успел создать параллельный запрос.
+        return False
+    return True
+
+
+def record_author(user_id, **deltas):
+    """Прибавляем `deltas` к счётчикам автора.
+
+    Если строки ещё нет (пользователь добавлен в обход ORM или до
+    появления сводок), она считается целиком, уже с учётом изменения.
+    """
+    summary = AuthorSummary.objects.filter(user_id=user_id)
+    values = {field: F(field) + delta for field, delta in deltas.items()}
+    if not summary.update(**values) and not create_author_summary(user_id):
+        summary.update(**values)
+
+
+def get_author_summary(user):
+    """Сводка автора, загруженная через `select_related('summary')`."""
+    try:
+        return user.summary
+    except AuthorSummary.DoesNotExist:
+        create_author_summary(user.pk)
+        return AuthorSummary.objects.get(user_id=user.pk)
+
+
+def refresh_author_summaries(user_ids=None, batch_size=1000):
+    """Пересчитываем сводки авторов порциями по `batch_size`.
+
+    Без `user_ids` проходим всех пользователей. Возвращаем число
+    записанных строк.
+    """
+    users = User.objects.order_by('pk').values_list('pk', flat=True)
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    last_pk = 0
+    total = 0
+    while True:
+        ids = list(users.filter(pk__gt=last_pk)[:batch_size])
+        if not ids:
+            return total
+        last_pk = ids[-1]
+        summaries = build_author_summaries(ids)
+        with transaction.atomic():
+            AuthorSummary.objects.filter(user_id__in=ids).delete()
+            AuthorSummary.objects.bulk_create(summaries)
+        total += len(summaries)
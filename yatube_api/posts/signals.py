@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AuthorSummary, User
+from .usernames import usernames
+
+
+@receiver(post_save, sender=User)
+def create_author_summary(sender, instance, created, raw=False, **kwargs):
+    """Новому пользователю сразу заводим пустую сводку автора."""
+    if created and not raw:
+        AuthorSummary.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def cache_username(sender, instance, **kwargs):
+    usernames.set(instance.pk, instance.username)
+
+
+@receiver(post_delete, sender=User)
+def forget_username(sender, instance, **kwargs):
+    usernames.forget(instance.pk)
@@ -0,0 +1,70 @@
+"""Кэш username пользователей по id в памяти процесса.
+
+Сериализаторы выводят автора по `author_id` и берут username отсюда,
+поэтому спискам не нужен JOIN с `auth_user`. Незнакомые id списка
+загружаются одним запросом (`prime`). Переименование и удаление через
+ORM обновляют кэш этого процесса сигналами (posts.signals), а другие
+процессы увидят изменение не позже чем через `USERNAME_CACHE_TTL`
+секунд.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import User
+
+
+class UsernameCache:
+    """Ограниченный LRU-кэш username по id."""
+
+    # Не больше стольких id в одном IN, чтобы уложиться в лимит
+    # параметров запроса SQLite.
+    chunk_size = 500
+
+    def __init__(self):
+        self._usernames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, pk):
+        """username по id или None, если его нет в кэше."""
+        with self._lock:
+            entry = self._usernames.get(pk)
+            if entry is None:
+                return None
+            username, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._usernames[pk]
+                return None
+            self._usernames.move_to_end(pk)
+            return username
+
+    def set(self, pk, username):
+        expires_at = time.monotonic() + settings.USERNAME_CACHE_TTL
+        with self._lock:
+            self._usernames.pop(pk, None)
+            self._usernames[pk] = (username, expires_at)
+            while len(self._usernames) > settings.USERNAME_CACHE_MAX_SIZE:
+                self._usernames.popitem(last=False)
+
+    def forget(self, pk):
+        with self._lock:
+            self._usernames.pop(pk, None)
+
+    def clear(self):
+        with self._lock:
+            self._usernames.clear()
+
+    def prime(self, pks):
+        """Загружаем username незнакомых id одним запросом на порцию."""
+        missing = sorted({pk for pk in pks if self.get(pk) is None})
+        for start in range(0, len(missing), self.chunk_size):
+            rows = User.objects.filter(
+                pk__in=missing[start:start + self.chunk_size]
+            ).values_list('pk', 'username')
+            for pk, username in rows:
+                self.set(pk, username)
+
+
+usernames = UsernameCache()
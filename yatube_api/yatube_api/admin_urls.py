@@ -0,0 +1,12 @@
+"""URL админки, которые импортируются при первом запросе к /admin/.
+
+Регистрация моделей (`admin.autodiscover()`) тоже происходит здесь, а не
+при запуске процесса.
+"""
+from django.contrib import admin
+
+admin.autodiscover()
+
+app_name = 'admin'
+
+urlpatterns = admin.site.get_urls()
@@ -14,3 +14,15 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
 
 application = get_asgi_application()
+
+from api.streams import CommentStreamApplication  # noqa: E402
+
+application = CommentStreamApplication(application)
+
+if os.environ.get('DJANGO_WARMUP'):
+    from yatube_api.warmup import warm_up
+
+    # ASGI-сервер импортирует приложение внутри цикла событий, где
+    # подключаться к базе нельзя, а запросы всё равно работают со
+    # своими соединениями в потоках sync_to_async.
+    warm_up(connect=False)
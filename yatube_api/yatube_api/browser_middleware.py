@@ -0,0 +1,50 @@
+"""Middleware браузерной части, которые пропускают запросы к API.
+
+Отдельно от `yatube_api.middleware`: middleware из `django.contrib`
+нельзя импортировать без настроенного Django, а сжатие нужно и
+бенчмаркам без него.
+"""
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import clickjacking, csrf
+
+
+def is_api_request(request):
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+def skip_for_api(middleware_class):
+    """Подкласс middleware, который не работает для запросов к API.
+
+    API авторизуется JWT-токеном, поэтому сессии, сообщения, CSRF и
+    защита от фреймов ему не нужны. Для остальных путей, например
+    админки, middleware работает как обычно.
+    """
+    attrs = {'__doc__': middleware_class.__doc__}
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super(wrapped, self).__call__(request)
+
+    attrs['__call__'] = __call__
+    if hasattr(middleware_class, 'process_view'):
+        def process_view(self, request, *args, **kwargs):
+            if is_api_request(request):
+                return None
+            return super(wrapped, self).process_view(
+                request, *args, **kwargs)
+
+        attrs['process_view'] = process_view
+    wrapped = type(middleware_class.__name__, (middleware_class,), attrs)
+    return wrapped
+
+
+SessionMiddleware = skip_for_api(sessions_middleware.SessionMiddleware)
+CsrfViewMiddleware = skip_for_api(csrf.CsrfViewMiddleware)
+AuthenticationMiddleware = skip_for_api(
+    auth_middleware.AuthenticationMiddleware)
+MessageMiddleware = skip_for_api(messages_middleware.MessageMiddleware)
+XFrameOptionsMiddleware = skip_for_api(clickjacking.XFrameOptionsMiddleware)
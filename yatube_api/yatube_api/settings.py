@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from datetime import timedelta
@@ -11,14 +12,15 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Модели админки регистрируются при первом обращении к /admin/,
+    # см. yatube_api/admin_urls.py.
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
-    'django_filters',
     'api',
     'posts',
     'djoser',
@@ -26,6 +28,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'yatube_api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -79,6 +82,31 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Хэшер новых паролей: pbkdf2, scrypt или argon2 (нужен пакет
+# argon2-cffi). Остальные хэшеры из списка только проверяют старые пароли,
+# которые при успешном входе перехэшируются выбранным.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'yatube_api.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'yatube_api.hashers.ScryptPasswordHasher',
+    'argon2': 'yatube_api.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS.pop(PASSWORD_HASHER)] + list(
+    _PASSWORD_HASHERS.values())
+
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 260000))
+PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 14
+PASSWORD_SCRYPT_BLOCK_SIZE = 8
+PASSWORD_SCRYPT_PARALLELISM = 1
+PASSWORD_ARGON2_TIME_COST = 2
+PASSWORD_ARGON2_MEMORY_COST = 102400
+PASSWORD_ARGON2_PARALLELISM = 8
+
+# Сколько паролей /api/v1/jwt/create/ проверяет одновременно в отдельных
+# потоках, не занимая поток обработки запросов.
+PASSWORD_HASH_WORKERS = 4
+
 LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
@@ -98,8 +126,12 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
+
+    'DEFAULT_THROTTLE_RATES': {
+        'jwt_refresh': '60/min',
+    },
 }
 
 SIMPLE_JWT = {
@@ -107,4 +139,70 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Асимметричная подпись JWT включается переменными окружения:
+# JWT_ALGORITHM=RS256 (RS384, RS512) и пути к ключам в PEM. Узлу, который
+# только проверяет токены, достаточно открытого ключа: его же отдаёт
+# /api/v1/jwt/public-key/.
+JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
+if not JWT_ALGORITHM.startswith('HS'):
+    SIMPLE_JWT['ALGORITHM'] = JWT_ALGORITHM
+    if os.environ.get('JWT_PRIVATE_KEY_FILE'):
+        SIMPLE_JWT['SIGNING_KEY'] = Path(
+            os.environ['JWT_PRIVATE_KEY_FILE']).read_text()
+    SIMPLE_JWT['VERIFYING_KEY'] = Path(
+        os.environ['JWT_PUBLIC_KEY_FILE']).read_text()
+
+# Проверенные JWT кэшируются в памяти процесса на JWT_VERIFY_CACHE_TTL
+# секунд, но не дольше срока действия токена. Повторное обновление того
+# же refresh-токена в течение JWT_REFRESH_REUSE_SECONDS секунд отдаёт
+# прежний access-токен. 0 отключает кэш.
+JWT_VERIFY_CACHE_TTL = 300
+JWT_REFRESH_REUSE_SECONDS = 30
+JWT_CACHE_MAX_SIZE = 10000
+
+# username пользователей по id кэшируются в памяти процесса (см.
+# posts.usernames). Переименование в другом процессе станет видно не
+# позже чем через USERNAME_CACHE_TTL секунд. Размер кэша должен быть
+# больше числа авторов на самой длинной странице ответа.
+USERNAME_CACHE_TTL = 300
+USERNAME_CACHE_MAX_SIZE = 10000
+
+# Ответы на POST с заголовком Idempotency-Key хранятся в кэше
+# IDEMPOTENCY_CACHE IDEMPOTENCY_KEY_TTL секунд, а отметка о ещё не
+# завершённом запросе — IDEMPOTENCY_LOCK_TTL секунд. Кэш по умолчанию
+# живёт в памяти процесса: при нескольких воркерах нужен общий (Redis,
+# Memcached).
+IDEMPOTENCY_CACHE = 'default'
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60
+IDEMPOTENCY_LOCK_TTL = 30
+
+# Префикс путей API, для которых `settings_production` отключает
+# сессии, CSRF и прочие middleware браузерной части.
+API_PATH_PREFIX = '/api/'
+
+# Ответы меньше этого размера в байтах не сжимаются.
+COMPRESSION_MIN_SIZE = 500
+
+# Счётчики просмотров и постов в группах (posts.counters) пишутся в базу
+# раз в COUNTERS_FLUSH_INTERVAL секунд или досрочно, когда в памяти
+# накопилось COUNTERS_MAX_KEYS разных объектов. Больше этого числа
+# ключей после неудачной записи в памяти не остаётся.
+COUNTERS_FLUSH_INTERVAL = 5.0
+COUNTERS_MAX_KEYS = 10000
+
+# Почасовая активность групп (posts.rollups) для статистики и трендов.
+# Команда refresh_rollups пересчитывает её за этот период, а более
+# старые часы удаляет.
+GROUP_ACTIVITY_RETENTION = timedelta(days=30)
+
+# Поток новых комментариев (SSE, только под ASGI). InProcessBroker
+# подходит для одного процесса; при нескольких воркерах используйте
+# api.events.ChangeLogBroker, который читает журнал изменений раз в
+# COMMENT_EVENTS_POLL_INTERVAL секунд. COMMENT_EVENTS_BUFFER — сколько
+# событий ждёт медленного клиента, прежде чем старые будут отброшены.
+COMMENT_EVENTS_BROKER = 'api.events.InProcessBroker'
+COMMENT_EVENTS_BUFFER = 100
+COMMENT_EVENTS_POLL_INTERVAL = 1.0
+COMMENT_EVENTS_HEARTBEAT = 15.0
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -0,0 +1,40 @@
+"""Настройки для боевого окружения.
+
+Использование: `DJANGO_SETTINGS_MODULE=yatube_api.settings_production`.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, REST_FRAMEWORK
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', '').split()
+
+# Для путей из API_PATH_PREFIX работают только Security, сжатие и Common:
+# остальные middleware пропускают такие запросы.
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'yatube_api.middleware.CompressionMiddleware',
+    'yatube_api.browser_middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'yatube_api.browser_middleware.CsrfViewMiddleware',
+    'yatube_api.browser_middleware.AuthenticationMiddleware',
+    'yatube_api.browser_middleware.MessageMiddleware',
+    'yatube_api.browser_middleware.XFrameOptionsMiddleware',
+]
+
+# Соединения с базой живут между запросами до минуты.
+DATABASES = {
+    **DATABASES,
+    'default': {**DATABASES['default'], 'CONN_MAX_AGE': 60},
+}
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+}
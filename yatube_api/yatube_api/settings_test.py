@@ -0,0 +1,24 @@
+"""Настройки для тестов.
+
+Использование: `DJANGO_SETTINGS_MODULE=yatube_api.settings_test`, уже
+задано в `pytest.ini`.
+"""
+from .settings import *  # noqa: F401,F403
+
+# PBKDF2 с сотнями тысяч итераций — самая дорогая часть фикстур
+# с пользователями. В тестах стойкость паролей не нужна.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# SQLite в памяти: у каждого воркера pytest-xdist своя база в своём
+# процессе, файлы на диске не создаются.
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+# Счётчики без фонового потока: тесты сбрасывают их сами.
+COUNTERS_FLUSH_INTERVAL = None
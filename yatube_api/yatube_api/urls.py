@@ -1,9 +1,10 @@
-from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+# Кортеж (urlconf, app_name, namespace) вместо include() откладывает
+# импорт модуля до первого запроса с этим префиксом.
 urlpatterns = [
-    path('admin/', admin.site.urls),
+    path('admin/', ('yatube_api.admin_urls', 'admin', 'admin')),
     path('api/', include('api.urls')),
     path(
         'redoc/',
@@ -0,0 +1,94 @@
+"""Прогрев воркера до первого запроса.
+
+Первый запрос в свежем процессе платит за компиляцию регулярных
+выражений роутера и построение полей сериализаторов. `warm_up()` делает
+это заранее. Точки входа вызывают его, если задана переменная окружения
+`DJANGO_WARMUP`. URLconf, которые подключены лениво (djoser, админка),
+не импортируются: они по-прежнему загружаются при первом запросе к ним.
+
+К базе точки входа не подключаются. Сервер может импортировать
+приложение до fork (например, gunicorn с `--preload`), а открытое
+соединение нельзя делить между процессами. Под ASGI импорт к тому же
+идёт внутри цикла событий, где синхронные вызовы ORM запрещены.
+Соединение заранее открывают в воркере: `open_connections()` в хуке
+`post_fork` или `warm_up(connect=True)`, если приложение импортируется
+уже в воркере.
+"""
+import logging
+import time
+
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def is_lazy(resolver):
+    """URLconf подключён строкой и ещё не импортирован."""
+    return (
+        isinstance(resolver.urlconf_name, str)
+        and 'urlconf_module' not in resolver.__dict__
+    )
+
+
+def compile_url_patterns(resolver=None):
+    """Компилируем регулярные выражения URL, не трогая ленивые URLconf."""
+    resolver = resolver or get_resolver()
+    count = 0
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        count += 1
+        if isinstance(pattern, URLResolver) and not is_lazy(pattern):
+            count += compile_url_patterns(pattern)
+    return count
+
+
+def prepare_urls():
+    """Импортируем корневой URLconf и компилируем URL.
+
+    Словари `reverse()` не заполняются: для этого пришлось бы
+    импортировать все ленивые URLconf.
+    """
+    return compile_url_patterns(get_resolver())
+
+
+def build_serializer_fields():
+    """Строим поля сериализаторов API."""
+    from api.serializers import (CommentSerializer, FollowSerializer,
+                                 GroupSerializer, PostSerializer)
+
+    serializers = (
+        PostSerializer, CommentSerializer, GroupSerializer, FollowSerializer)
+    for serializer_class in serializers:
+        serializer_class().fields
+    return len(serializers)
+
+
+def open_connections():
+    """Подключаемся ко всем базам из настроек."""
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def warm_up(connect=False):
+    """Прогреваем URL, сериализаторы и, с `connect`, соединения с базой.
+
+    Возвращает время каждого шага в секундах.
+    """
+    steps = [
+        ('urls', prepare_urls),
+        ('serializers', build_serializer_fields),
+    ]
+    if connect:
+        steps.append(('connections', open_connections))
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - started
+    logger.info(
+        'Прогрев воркера: %s',
+        ', '.join(f'{name} {seconds * 1000:.1f} мс'
+                  for name, seconds in timings.items()))
+    return timings
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
 
 application = get_wsgi_application()
+
+if os.environ.get('DJANGO_WARMUP'):
+    from yatube_api.warmup import warm_up
+
+    # Сервер может импортировать приложение до fork, поэтому к базе
+    # не подключаемся: соединение нельзя делить между воркерами.
+    warm_up()